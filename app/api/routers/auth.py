@@ -83,6 +83,7 @@ async def delete_user(
     """
     try:
         result = repo.users_collection.delete_one({"clerk_user_id": clerk_user_id})
+        repo.invalidate_cached_user(clerk_user_id)
         if result.deleted_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 
@@ -17,7 +18,15 @@ from app.core.schemas import (
     UpdateParticipantPreferencesRequest,
     User,
 )
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +55,7 @@ async def create_trip_invite(
     if invite_data.destination:
         try:
             if cover_image_service:
-                cover_image_url = cover_image_service.get_cover_image(
+                cover_image_url = await cover_image_service.aget_cover_image(
                     invite_data.destination, repo
                 )
         except Exception as e:
@@ -370,7 +379,7 @@ async def send_invites(
         raise HTTPException(status_code=500, detail="Failed to send invites")
 
     # Send actual emails to all participants
-    from app.core.email_service import send_trip_invite_email
+    from app.core.email_service import send_trip_invite_emails
 
     organizer_name = invite.get("organizer_name", "Trip Organizer")
     trip_name = invite.get("trip_name", "Group Trip")
@@ -381,33 +390,27 @@ async def send_invites(
     sent_count = 0
     failed_emails = []
 
-    for participant in invite.get("participants", []):
-        if participant.get("is_organizer"):
-            continue  # Skip organizer
-
-        email = participant.get("email")
-        if not email:
-            continue
+    # Skip the organizer and anyone without an email address
+    recipients = [
+        (participant["email"], participant.get("first_name", "").strip() or None)
+        for participant in invite.get("participants", [])
+        if not participant.get("is_organizer") and participant.get("email")
+    ]
 
-        try:
-            # Extract first_name from participant
-            recipient_first_name = participant.get("first_name", "").strip()
-
-            send_trip_invite_email(
-                to_email=email,
-                invite_id=invite_id,
-                organizer_name=organizer_name,
-                trip_name=trip_name,
-                destination=destination,
-                date_range_start=date_range_start,
-                date_range_end=date_range_end,
-                recipient_first_name=(
-                    recipient_first_name if recipient_first_name else None
-                ),
-            )
+    results = await asyncio.to_thread(
+        send_trip_invite_emails,
+        recipients=recipients,
+        invite_id=invite_id,
+        organizer_name=organizer_name,
+        trip_name=trip_name,
+        destination=destination,
+        date_range_start=date_range_start,
+        date_range_end=date_range_end,
+    )
+    for (email, _), sent in zip(recipients, results):
+        if sent:
             sent_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send email to {email}: {e}")
+        else:
             failed_emails.append(email)
 
     return {
@@ -422,6 +425,7 @@ async def send_invites(
 
 @router.post("/invites/{invite_id}/respond")
 async def respond_to_invite(
+    background_tasks: BackgroundTasks,
     invite_id: str = Path(
         ...,
         min_length=1,
@@ -494,12 +498,9 @@ async def respond_to_invite(
                 organizer_clerk_id = updated_invite.get("organizer_clerk_id")
                 organizer = await repo.get_user_by_clerk_id(organizer_clerk_id)
                 if organizer:
-                    import os
+                    from app.core.email_service import FRONTEND_URL, email_service
 
-                    from app.core.email_service import email_service
-
-                    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3456")
-                    generate_link = f"{frontend_url}/invites?highlight={invite_id}"
+                    generate_link = f"{FRONTEND_URL}/invites?highlight={invite_id}"
 
                     # Extract first name
                     organizer_first_name = (
@@ -510,7 +511,8 @@ async def respond_to_invite(
                     # Count group size (all participants including organizer)
                     group_size = len(participants)
 
-                    email_service.send_all_participants_responded_email(
+                    background_tasks.add_task(
+                        email_service.send_all_participants_responded_email,
                         organizer_email=organizer.email,
                         organizer_first_name=organizer_first_name,
                         destination=updated_invite.get(
@@ -521,7 +523,7 @@ async def respond_to_invite(
                         generate_link=generate_link,
                     )
                     logger.info(
-                        f"[Email] Sent all participants responded email to organizer {organizer.email}"
+                        f"[Email] Queued all participants responded email to organizer {organizer.email}"
                     )
             except Exception as e:
                 logger.error(
@@ -707,7 +709,7 @@ async def resend_invites(
     current_user: User = Depends(get_current_user_from_clerk),
 ):
     """Resend invites to selected participants (organizer only)."""
-    from app.core.email_service import send_trip_invite_email
+    from app.core.email_service import send_trip_invite_emails
 
     clerk_user_id = current_user.clerk_user_id
 
@@ -752,29 +754,24 @@ async def resend_invites(
     sent_count = 0
     failed_emails = []
 
-    for email in request_data.participant_emails:
-        try:
-            # Find participant to get first_name
-            participant = next(
-                (p for p in invite.get("participants", []) if p.get("email") == email),
-                None,
-            )
-            recipient_first_name = (
-                participant.get("first_name", "").strip() if participant else None
-            )
-
-            send_trip_invite_email(
-                to_email=email,
-                invite_id=invite_id,
-                organizer_name=organizer_name,
-                trip_name=trip_name,
-                recipient_first_name=(
-                    recipient_first_name if recipient_first_name else None
-                ),
-            )
+    first_names = {
+        p.get("email"): p.get("first_name", "").strip()
+        for p in invite.get("participants", [])
+    }
+    results = await asyncio.to_thread(
+        send_trip_invite_emails,
+        recipients=[
+            (email, first_names.get(email) or None)
+            for email in request_data.participant_emails
+        ],
+        invite_id=invite_id,
+        organizer_name=organizer_name,
+        trip_name=trip_name,
+    )
+    for email, sent in zip(request_data.participant_emails, results):
+        if sent:
             sent_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send email to {email}: {e}", exc_info=True)
+        else:
             failed_emails.append(email)
 
     # Recalculate date analysis after resend
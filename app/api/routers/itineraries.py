@@ -1,12 +1,12 @@
 import asyncio
 import hashlib
-import json
 import logging
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import orjson
 from app.core.clerk_security import get_current_user_from_clerk
 from app.core.cover_image_service import cover_image_service
 from app.core.destination_profiling_service import destination_profiling_service
@@ -22,12 +22,65 @@ from app.core.schemas import (
     User,
 )
 from app.core.semantic_category_service import semantic_category_service
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/itineraries", tags=["itineraries"])
 
+# Separators in free-text "other interests" ("hiking, jazz\nstreet food")
+_INTEREST_SPLIT_RE = re.compile(r"[,\n]")
+# First [...] in an LLM response that may carry prose around the JSON
+_JSON_ARRAY_RE = re.compile(r"\[.*?\]", re.DOTALL)
+
+# Invariant across trips; per-trip details go in the user message
+_TRIP_NOTES_SYSTEM_PROMPT = {
+    "role": "system",
+    "content": (
+        "Generate 6-8 comprehensive, practical travel tips for this trip. "
+        "Cover these essential categories (mix and match as relevant to the destination):\n"
+        "1. Safety & Security - local safety tips, areas to avoid, emergency contacts\n"
+        "2. Money & Payments - cash vs card, tipping customs, currency tips\n"
+        "3. Local Customs & Etiquette - cultural norms, dress codes, behavior expectations\n"
+        "4. Practical Logistics - transport, booking recommendations, best times to visit\n"
+        "5. Weather & Packing - seasonal considerations, what to bring\n"
+        "6. Communication - WiFi, SIM cards, language basics\n\n"
+        "Make each tip specific to the destination, actionable, and genuinely useful. "
+        "Return ONLY a JSON array of strings, no other text. "
+        'Example: ["Tip 1", "Tip 2", "Tip 3"]'
+    ),
+}
+
+# Invariant across trips and days so the prompt prefix is identical for every
+# timing call; the schedule preference and activities go in the user message
+_TIMING_SYSTEM_PROMPT = {
+    "role": "system",
+    "content": (
+        "You are a travel itinerary timing optimizer. Given a list of activities for a single day, "
+        "assign realistic start times considering:\n\n"
+        "IMPORTANT RULES:\n"
+        "1. RESPECT ACTUAL VENUE HOURS: Each activity shows its actual operating hours (if available). "
+        "Schedule activities ONLY during their open hours.\n"
+        "2. ACCOUNT FOR TRAVEL TIME: Travel time and distance to the next activity are provided. "
+        "Ensure next activity starts AFTER current activity ends + travel time + small buffer.\n"
+        "3. ESTIMATE ACTIVITY DURATION: Museums/attractions (2-3h), meals (1-2h), cafes (45min-1h), "
+        "bars/nightlife (2-3h), parks (1-2h), shopping (1-2h).\n"
+        "4. NATURAL PACING: Allow 10-15min buffer between activities for breaks/transitions.\n"
+        "5. SCHEDULE PREFERENCE: The user message starts with the traveler's schedule preference. "
+        "Shift activities earlier/later within venue hours based on this preference.\n\n"
+        "Return ONLY a JSON array of time strings in 12-hour format (e.g., ['9:00 AM', '12:30 PM', '3:00 PM']).\n"
+        "The array must have exactly the same number of times as activities provided."
+    ),
+}
+
 
 def _optimize_day_times(
     day: Day,
@@ -421,7 +474,7 @@ def _parse_itinerary_json_or_502(raw_text: str) -> ItineraryDocument:
 
     # Try loading as JSON and validating
     try:
-        data = json.loads(text)
+        data = orjson.loads(text)
         if isinstance(data, dict):
             return ItineraryDocument.model_validate(data)
     except Exception:
@@ -433,7 +486,7 @@ def _parse_itinerary_json_or_502(raw_text: str) -> ItineraryDocument:
     if start != -1 and end != -1 and end > start:
         candidate = text[start : end + 1]
         try:
-            data = json.loads(candidate)
+            data = orjson.loads(candidate)
             if isinstance(data, dict):
                 return ItineraryDocument.model_validate(data)
         except Exception:
@@ -508,7 +561,9 @@ def _parse_itinerary_json_or_502(raw_text: str) -> ItineraryDocument:
 # ----------------------------------------------
 @router.post("/generate2", response_model=dict[str, Any])
 async def generate_itinerary_v2(
-    payload: ItineraryGenerateRequest, request: Request
+    payload: ItineraryGenerateRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
 ) -> dict[str, Any]:
     """
     Deterministic itinerary generation using weighted scoring over Google Places
@@ -637,52 +692,30 @@ async def generate_itinerary_v2(
     async def generate_trip_notes_async() -> list[str]:
         """Generate trip notes asynchronously."""
         try:
-            from app.core.llm_provider import LLMProvider
+            from app.core.llm_provider import get_llm_provider, strip_code_fences
             from app.core.settings import get_settings
 
-            settings = get_settings()
-            provider = LLMProvider(model=settings.aisuite_model)
+            provider = get_llm_provider(get_settings().aisuite_model)
 
             # Build context for notes generation
-            notes_context = f"Destination: {destination}\n"
-            notes_context += f"Trip Type: {trip_type}\n"
-            notes_context += f"Duration: {len(day_list)} days\n"
+            notes_context = (
+                f"Destination: {destination}\n"
+                f"Trip Type: {trip_type}\n"
+                f"Duration: {len(day_list)} days\n"
+            )
             if interests:
                 notes_context += f"Interests: {', '.join(interests[:5])}\n"
 
-            notes_prompt = {
-                "role": "system",
-                "content": (
-                    "Generate 6-8 comprehensive, practical travel tips for this trip. "
-                    "Cover these essential categories (mix and match as relevant to the destination):\n"
-                    "1. Safety & Security - local safety tips, areas to avoid, emergency contacts\n"
-                    "2. Money & Payments - cash vs card, tipping customs, currency tips\n"
-                    "3. Local Customs & Etiquette - cultural norms, dress codes, behavior expectations\n"
-                    "4. Practical Logistics - transport, booking recommendations, best times to visit\n"
-                    "5. Weather & Packing - seasonal considerations, what to bring\n"
-                    "6. Communication - WiFi, SIM cards, language basics\n\n"
-                    "Make each tip specific to the destination, actionable, and genuinely useful. "
-                    "Return ONLY a JSON array of strings, no other text. "
-                    'Example: ["Tip 1", "Tip 2", "Tip 3"]'
-                ),
-            }
-
             notes_user = {"role": "user", "content": notes_context}
 
             notes_response = await provider.chat_async(
-                messages=[notes_prompt, notes_user], temperature=0.7
+                messages=[_TRIP_NOTES_SYSTEM_PROMPT, notes_user], temperature=0.7
             )
 
-            # Parse the JSON response
-            notes_text = notes_response.strip()
-            if notes_text.startswith("```"):
-                # Remove markdown code fences
-                lines = notes_text.split("\n")
-                notes_text = "\n".join(
-                    [line for line in lines if not line.startswith("```")]
-                )
+            # Parse the JSON response, removing markdown code fences if present
+            notes_text = strip_code_fences(notes_response)
 
-            trip_notes = json.loads(notes_text)
+            trip_notes = orjson.loads(notes_text)
 
             # Validate it's a list
             if not isinstance(trip_notes, list):
@@ -713,7 +746,7 @@ async def generate_itinerary_v2(
     elif isinstance(raw_other_interests, str):
         other_interests_texts = [
             part.strip()
-            for part in re.split(r"[,\n]", raw_other_interests)
+            for part in _INTEREST_SPLIT_RE.split(raw_other_interests)
             if part.strip()
         ]
     else:
@@ -1764,26 +1797,15 @@ async def generate_itinerary_v2(
     # Fetch opening hours for chosen venues (parallelize to avoid blocking)
     print("[OpeningHours] Fetching opening hours for selected venues...")
 
-    async def fetch_place_details(place_id: str) -> tuple[str, dict[str, Any] | None]:
-        """Fetch place details for a single place_id."""
-
-        # Only request opening_hours since we already have everything else from search
-        def _get_details():
-            return places_service.get_place_details(place_id, fields="opening_hours")
-
-        details = await asyncio.to_thread(_get_details)
-        return (place_id, details)
-
-    # Fetch all place details in parallel
-    place_detail_tasks = [
-        fetch_place_details(v["place_id"]) for v in chosen if v.get("place_id")
-    ]
-    place_details_results = await asyncio.gather(*place_detail_tasks)
+    # Fetch all place details in parallel on the places service's worker pool.
+    # Only request opening_hours since we already have everything else from search
+    detail_place_ids = [v["place_id"] for v in chosen if v.get("place_id")]
+    place_details_results = await asyncio.to_thread(
+        places_service.get_place_details_bulk, detail_place_ids, "opening_hours"
+    )
 
     # Map results back to venues
-    place_details_map = {
-        place_id: details for place_id, details in place_details_results
-    }
+    place_details_map = dict(zip(detail_place_ids, place_details_results))
     for v in chosen:
         if v.get("place_id"):
             details = place_details_map.get(v["place_id"])
@@ -1893,11 +1915,10 @@ async def generate_itinerary_v2(
     # Apply LLM-based timing to each day's activities (PARALLELIZED)
     print("[Timing] Generating realistic activity times with LLM (parallel)...")
     try:
-        from app.core.llm_provider import LLMProvider
+        from app.core.llm_provider import get_llm_provider, strip_code_fences
         from app.core.settings import get_settings
 
-        settings = get_settings()
-        provider = LLMProvider(model=settings.aisuite_model)
+        provider = get_llm_provider(get_settings().aisuite_model)
 
         async def generate_day_timing(
             day_idx: int, day: Day
@@ -1961,35 +1982,15 @@ async def generate_itinerary_v2(
             else:
                 schedule_guidance = "NIGHT OWL: Start first activity 10:00-11:00 AM, end day around 11:00 PM-midnight"
 
-            timing_prompt = {
-                "role": "system",
-                "content": (
-                    "You are a travel itinerary timing optimizer. Given a list of activities for a single day, "
-                    "assign realistic start times considering:\n\n"
-                    "IMPORTANT RULES:\n"
-                    "1. RESPECT ACTUAL VENUE HOURS: Each activity shows its actual operating hours (if available). "
-                    "Schedule activities ONLY during their open hours.\n"
-                    "2. ACCOUNT FOR TRAVEL TIME: Travel time and distance to the next activity are provided. "
-                    "Ensure next activity starts AFTER current activity ends + travel time + small buffer.\n"
-                    "3. ESTIMATE ACTIVITY DURATION: Museums/attractions (2-3h), meals (1-2h), cafes (45min-1h), "
-                    "bars/nightlife (2-3h), parks (1-2h), shopping (1-2h).\n"
-                    "4. NATURAL PACING: Allow 10-15min buffer between activities for breaks/transitions.\n\n"
-                    f"SCHEDULE PREFERENCE: {schedule_guidance}\n"
-                    "Shift activities earlier/later within venue hours based on this preference.\n\n"
-                    "Return ONLY a JSON array of time strings in 12-hour format (e.g., ['9:00 AM', '12:30 PM', '3:00 PM']).\n"
-                    "The array must have exactly the same number of times as activities provided."
-                ),
-            }
-
             timing_user = {
                 "role": "user",
-                "content": f"Day {day_idx+1} activities:\n"
-                + "\n".join(activity_context),
+                "content": f"SCHEDULE PREFERENCE: {schedule_guidance}\n\n"
+                f"Day {day_idx+1} activities:\n" + "\n".join(activity_context),
             }
 
             # Use async LLM call
             timing_response = await provider.chat_async(
-                messages=[timing_prompt, timing_user], temperature=0.3
+                messages=[_TIMING_SYSTEM_PROMPT, timing_user], temperature=0.3
             )
 
             # Parse timing response
@@ -2004,15 +2005,11 @@ async def generate_itinerary_v2(
                 return (day_idx, None)
 
             # Remove markdown code fences
-            if timing_text.startswith("```"):
-                lines = timing_text.split("\n")
-                timing_text = "\n".join(
-                    [line for line in lines if not line.startswith("```")]
-                )
+            timing_text = strip_code_fences(timing_text)
 
             # Try to extract JSON array from text
             # Look for [...] pattern
-            match = re.search(r"\[.*?\]", timing_text, re.DOTALL)
+            match = _JSON_ARRAY_RE.search(timing_text)
             if match:
                 timing_text = match.group(0)
             else:
@@ -2027,11 +2024,11 @@ async def generate_itinerary_v2(
             print(
                 f"[Timing Debug] Extracted JSON for Day {day_idx+1}: {timing_text[:200]}"
             )
-            # Parse JSON (json is imported at top level)
+            # Parse JSON (orjson is imported at top level)
             try:
-                times = json.loads(timing_text)
+                times = orjson.loads(timing_text)
             except ValueError as e:
-                # json.JSONDecodeError is a subclass of ValueError
+                # orjson.JSONDecodeError is a subclass of ValueError
                 print(f"[Timing] JSON decode error for Day {day_idx+1}: {e}")
                 return (day_idx, None)
 
@@ -2401,7 +2398,7 @@ async def generate_itinerary_v2(
     # Add cover image using Unsplash (with caching)
     try:
         if cover_image_service:
-            cover_image_url = cover_image_service.get_cover_image(destination, repo)
+            cover_image_url = await cover_image_service.aget_cover_image(destination, repo)
             if cover_image_url:
                 doc.cover_image = cover_image_url
     except Exception as e:
@@ -2447,10 +2444,9 @@ async def generate_itinerary_v2(
 
             # Check if user hasn't received first itinerary email yet
             if not user.first_itinerary_email_sent:
-                from app.core.email_service import email_service
+                from app.core.email_service import FRONTEND_URL, email_service
 
-                frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3456")
-                itinerary_link = f"{frontend_url}/trips"
+                itinerary_link = f"{FRONTEND_URL}/trips"
 
                 # Format dates for email
                 trip_dates = doc.dates
@@ -2460,8 +2456,9 @@ async def generate_itinerary_v2(
                     user.first_name or user.email.split("@")[0].split(".")[0].title()
                 )
 
-                # Send email
-                email_service.send_first_itinerary_email(
+                # Send email after the response goes out
+                background_tasks.add_task(
+                    email_service.send_first_itinerary_email,
                     recipient_email=user.email,
                     recipient_first_name=first_name,
                     destination=destination,
@@ -2477,15 +2474,16 @@ async def generate_itinerary_v2(
                         {
                             "$set": {
                                 "first_itinerary_email_sent": True,
-                                "updated_at": datetime.utcnow(),
+                                "updated_at": datetime.now(timezone.utc),
                             }
                         },
                     )
+                    repo.invalidate_cached_user(clerk_user_id)
 
                 await asyncio.to_thread(_update_user)
 
                 await asyncio.to_thread(_update_user)
-                print(f"[Email] Sent first itinerary email to {user.email}")
+                print(f"[Email] Queued first itinerary email to {user.email}")
     except Exception as e:
         print(f"[Email] Error sending first itinerary email: {e}")
         # Non-fatal: continue even if email fails
@@ -2511,7 +2509,7 @@ async def generate_itinerary_v2(
 
                 invite = await asyncio.to_thread(_get_invite)
                 if invite:
-                    from app.core.email_service import email_service
+                    from app.core.email_service import FRONTEND_URL, email_service
 
                     # Get user for organizer name (already fetched above for first itinerary email)
                     def _find_user_again():
@@ -2532,8 +2530,7 @@ async def generate_itinerary_v2(
                         )
 
                     # Build itinerary link (public route that handles auth redirect)
-                    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3456")
-                    itinerary_link = f"{frontend_url}/itinerary/{itn_id}"
+                    itinerary_link = f"{FRONTEND_URL}/itinerary/{itn_id}"
 
                     participants = invite.get("participants", [])
                     group_size = len(participants)
@@ -2549,7 +2546,8 @@ async def generate_itinerary_v2(
                                 or recipient_email.split("@")[0].split(".")[0].title()
                             )
 
-                            email_service.send_itinerary_ready_email(
+                            background_tasks.add_task(
+                                email_service.send_itinerary_ready_email,
                                 recipient_email=recipient_email,
                                 recipient_first_name=recipient_first_name,
                                 organizer_name=organizer_name,
@@ -2560,7 +2558,7 @@ async def generate_itinerary_v2(
                                 itinerary_link=itinerary_link,
                             )
                             print(
-                                f"[Email] Sent itinerary ready email to {recipient_email}"
+                                f"[Email] Queued itinerary ready email to {recipient_email}"
                             )
             except Exception as e:
                 print(f"[Email] Error sending itinerary ready emails: {e}")
@@ -2782,9 +2780,7 @@ async def share_itinerary(
     current_user: User = Depends(get_current_user_from_clerk),
 ):
     """Share an itinerary with participants by creating or updating an invite."""
-    from datetime import datetime
-
-    from app.core.email_service import send_trip_invite_email
+    from app.core.email_service import send_trip_invite_emails
 
     clerk_user_id = current_user.clerk_user_id
 
@@ -2840,7 +2836,7 @@ async def share_itinerary(
                     {
                         "$set": {
                             "trip_name": trip_name,
-                            "updated_at": datetime.utcnow(),
+                            "updated_at": datetime.now(timezone.utc),
                         }
                     },
                 )
@@ -2885,34 +2881,24 @@ async def share_itinerary(
         sent_count = 0
         failed_emails = []
 
-        for email in participant_emails:
-            try:
-                # Find participant to get first_name
-                updated_invite = repo.get_trip_invite(invite_id)
-                participant = next(
-                    (
-                        p
-                        for p in updated_invite.get("participants", [])
-                        if p.get("email") == email
-                    ),
-                    None,
-                )
-                recipient_first_name = (
-                    participant.get("first_name", "").strip() if participant else None
-                )
-
-                send_trip_invite_email(
-                    to_email=email,
-                    invite_id=invite_id,
-                    organizer_name=organizer_name,
-                    trip_name=trip_name,
-                    recipient_first_name=(
-                        recipient_first_name if recipient_first_name else None
-                    ),
-                )
+        # Look up first names once, then send every invite in one batch
+        first_names = {
+            p.get("email"): p.get("first_name", "").strip()
+            for p in repo.get_trip_invite(invite_id).get("participants", [])
+        }
+        results = await asyncio.to_thread(
+            send_trip_invite_emails,
+            recipients=[
+                (email, first_names.get(email) or None) for email in participant_emails
+            ],
+            invite_id=invite_id,
+            organizer_name=organizer_name,
+            trip_name=trip_name,
+        )
+        for email, sent in zip(participant_emails, results):
+            if sent:
                 sent_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send email to {email}: {e}", exc_info=True)
+            else:
                 failed_emails.append(email)
 
         # Mark invites as sent
@@ -2976,33 +2962,24 @@ async def share_itinerary(
         sent_count = 0
         failed_emails = []
 
-        for email in participant_emails:
-            try:
-                # Find participant to get first_name
-                participant = next(
-                    (
-                        p
-                        for p in repo.get_trip_invite(invite_id).get("participants", [])
-                        if p.get("email") == email
-                    ),
-                    None,
-                )
-                recipient_first_name = (
-                    participant.get("first_name", "").strip() if participant else None
-                )
-
-                send_trip_invite_email(
-                    to_email=email,
-                    invite_id=invite_id,
-                    organizer_name=organizer_name,
-                    trip_name=trip_name,
-                    recipient_first_name=(
-                        recipient_first_name if recipient_first_name else None
-                    ),
-                )
+        # Look up first names once, then send every invite in one batch
+        first_names = {
+            p.get("email"): p.get("first_name", "").strip()
+            for p in repo.get_trip_invite(invite_id).get("participants", [])
+        }
+        results = await asyncio.to_thread(
+            send_trip_invite_emails,
+            recipients=[
+                (email, first_names.get(email) or None) for email in participant_emails
+            ],
+            invite_id=invite_id,
+            organizer_name=organizer_name,
+            trip_name=trip_name,
+        )
+        for email, sent in zip(participant_emails, results):
+            if sent:
                 sent_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send email to {email}: {e}", exc_info=True)
+            else:
                 failed_emails.append(email)
 
         # Mark invites as sent
@@ -1,16 +1,88 @@
+import asyncio
+import hashlib
+import json
 from urllib.parse import unquote
 
 import requests
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
 from app.core.places_service import places_service
-from fastapi import APIRouter, HTTPException, Query, Response
+from app.core.ttl_cache import TTLCache
 
 router = APIRouter(prefix="/places", tags=["places"])
 
+# Autocomplete results are shared across users: cache them briefly and let
+# browsers/CDNs reuse them for the same window.
+AUTOCOMPLETE_CACHE_TTL_SECONDS = 60
+AUTOCOMPLETE_CACHE_MAX_SIZE = 5000
+_AUTOCOMPLETE_CACHE_CONTROL = f"public, max-age={AUTOCOMPLETE_CACHE_TTL_SECONDS}"
+
+# normalized query -> (suggestions, etag)
+_autocomplete_cache = TTLCache(
+    maxsize=AUTOCOMPLETE_CACHE_MAX_SIZE, ttl=AUTOCOMPLETE_CACHE_TTL_SECONDS
+)
+# normalized query -> future for an upstream lookup that is already running
+_autocomplete_inflight: dict[str, asyncio.Future] = {}
+
+
+async def _get_autocomplete_suggestions(query: str) -> tuple[list[dict], str]:
+    """Return (suggestions, etag), reusing cached or in-flight upstream lookups."""
+    key = " ".join(query.lower().split())
+
+    cached = _autocomplete_cache.get(key)
+    if cached is not None:
+        return cached
+
+    inflight = _autocomplete_inflight.get(key)
+    if inflight is not None:
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            # The leading request was cancelled, not this one: look it up ourselves
+            if inflight.cancelled():
+                return await _get_autocomplete_suggestions(query)
+            raise
+
+    future = asyncio.get_running_loop().create_future()
+    _autocomplete_inflight[key] = future
+    try:
+        suggestions = await asyncio.to_thread(places_service.autocomplete_places, query)
+        body = json.dumps(suggestions, sort_keys=True, separators=(",", ":"))
+        etag = f'"{hashlib.md5(body.encode("utf-8")).hexdigest()}"'
+
+        # Empty results usually mean an upstream error; don't pin them in the cache
+        if suggestions:
+            _autocomplete_cache.set(key, (suggestions, etag))
+
+        future.set_result((suggestions, etag))
+        return suggestions, etag
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved when nobody else was waiting on it
+        future.exception()
+        raise
+    finally:
+        # A cancelled leader skips the handlers above; release any waiters
+        if not future.done():
+            future.cancel()
+        _autocomplete_inflight.pop(key, None)
+
 
 @router.get("/autocomplete")
-def autocomplete(query: str = Query(..., min_length=2, max_length=120)) -> list[dict]:
+async def autocomplete(
+    request: Request,
+    response: Response,
+    query: str = Query(..., min_length=2, max_length=120),
+) -> list[dict]:
     """Return destination suggestions for a free-text query."""
-    return places_service.autocomplete_places(query)
+    suggestions, etag = await _get_autocomplete_suggestions(query)
+
+    headers = {"Cache-Control": _AUTOCOMPLETE_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return suggestions
 
 
 @router.get("/photo")
@@ -32,7 +104,9 @@ async def get_place_photo(
             raise HTTPException(status_code=400, detail="Invalid photo reference")
 
         # Fetch the image from Google
-        response = requests.get(photo_url, timeout=10, stream=True)
+        # Not streamed: the body is read in full below, and reading it up front
+        # returns the pooled connection even when raise_for_status() raises
+        response = places_service.session.get(photo_url, timeout=10)
         response.raise_for_status()
 
         # Determine content type
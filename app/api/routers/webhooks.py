@@ -5,19 +5,23 @@ This replaces the manual frontend sync with automatic webhook-based sync.
 When users sign up with Clerk, this webhook automatically creates them in our database.
 """
 
+import asyncio
 import base64
-import hashlib
+import binascii
 import hmac
-import json
 import os
+import time
 import traceback
 from typing import Any
 
-from app.core.repository import repo
-from app.core.schemas import ClerkUserSync
+import orjson
 from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.responses import Response
 
+from app.core.repository import repo
+from app.core.schemas import ClerkUserSync
+from app.core.ttl_cache import TTLCache
+
 # Webhook router
 webhook_router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
@@ -26,6 +30,106 @@ api_webhook_router = APIRouter(prefix="/api/webhooks", tags=["api-webhooks"])
 
 CLERK_WEBHOOK_SIGNING_SECRET = os.getenv("CLERK_WEBHOOK_SIGNING_SECRET", "")
 
+# Size of an HMAC-SHA256 digest, which is what Svix signs webhooks with
+_SIGNATURE_DIGEST_SIZE = 32
+
+# Maximum allowed clock skew (seconds) between the svix-timestamp header and now
+WEBHOOK_TIMESTAMP_TOLERANCE_SECONDS = 5 * 60
+
+# Recently processed svix-id values, used to acknowledge Clerk retries without
+# re-running the DB sync. Per-process only.
+_PROCESSED_MSG_TTL_SECONDS = 60 * 60
+_PROCESSED_MSG_MAX_SIZE = 50_000
+_processed_msg_ids = TTLCache(maxsize=_PROCESSED_MSG_MAX_SIZE, ttl=_PROCESSED_MSG_TTL_SECONDS)
+
+# svix-id values currently being handled, mapped to a future that resolves to whether
+# handling succeeded. Concurrent duplicates wait on it instead of syncing a second time.
+_inflight_msg_ids: dict[str, asyncio.Future[bool]] = {}
+
+
+def _is_duplicate_message(msg_id: str | None) -> bool:
+    """Return True if this svix-id was already processed within the TTL window."""
+    return bool(msg_id) and msg_id in _processed_msg_ids
+
+
+def _mark_message_processed(msg_id: str | None) -> None:
+    """Remember a processed svix-id, evicting the least recently seen when full."""
+    if msg_id:
+        _processed_msg_ids.set(msg_id, True)
+
+
+class _ClerkUserSyncBatcher:
+    """
+    Coalesce user syncs from concurrent webhook deliveries into bulk DB writes.
+
+    Each caller awaits its own result; a batch is flushed when it reaches
+    max_batch_size or max_wait_seconds after the first queued sync.
+    """
+
+    def __init__(self, max_batch_size: int = 100, max_wait_seconds: float = 0.05):
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: list[tuple[ClerkUserSync, asyncio.Future]] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        # Strong references to running batch writes; the event loop only keeps
+        # weak ones, so an unreferenced task could be collected mid-write
+        self._write_tasks: set[asyncio.Task] = set()
+
+    async def sync(self, clerk_user_sync: ClerkUserSync):
+        """Queue a user sync and wait for the batch containing it to be written."""
+        future = asyncio.get_running_loop().create_future()
+        async with self._lock:
+            self._pending.append((clerk_user_sync, future))
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take_batch()
+                task = asyncio.create_task(self._write(batch))
+                self._write_tasks.add(task)
+                task.add_done_callback(self._write_tasks.discard)
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_after_delay())
+        return await future
+
+    def _take_batch(self) -> list[tuple[ClerkUserSync, asyncio.Future]]:
+        batch, self._pending = self._pending, []
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        return batch
+
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self.max_wait_seconds)
+        async with self._lock:
+            self._flush_task = None
+            batch, self._pending = self._pending, []
+        await self._write(batch)
+
+    async def _write(self, batch: list[tuple[ClerkUserSync, asyncio.Future]]):
+        if not batch:
+            return
+        try:
+            users = await repo.sync_clerk_users_bulk([item for item, _ in batch])
+        except Exception as e:
+            # One bad user (e.g. a duplicate email) fails the whole bulk write;
+            # retry one by one so only that delivery gets the error
+            print(f"Bulk user sync of {len(batch)} users failed, retrying individually: {e}")
+            for item, future in batch:
+                try:
+                    user = await repo.sync_clerk_user(item)
+                except Exception as item_error:
+                    if not future.done():
+                        future.set_exception(item_error)
+                else:
+                    if not future.done():
+                        future.set_result(user)
+            return
+        for (_, future), user in zip(batch, users):
+            if not future.done():
+                future.set_result(user)
+
+
+_user_sync_batcher = _ClerkUserSyncBatcher()
+
 
 def verify_webhook_signature(
     payload: bytes,
@@ -51,6 +155,17 @@ def verify_webhook_signature(
         print("No webhook signing secret configured")
         return False
 
+    # Reject stale or replayed deliveries before doing any crypto work
+    try:
+        sent_at = int(timestamp)
+    except (TypeError, ValueError):
+        print(f"Invalid webhook timestamp: {timestamp}")
+        return False
+
+    if abs(time.time() - sent_at) > WEBHOOK_TIMESTAMP_TOLERANCE_SECONDS:
+        print(f"Webhook timestamp outside tolerance window: {timestamp}")
+        return False
+
     # Remove whsec_ prefix if present
     if secret.startswith("whsec_"):
         secret = secret[6:]  # Remove 'whsec_' prefix
@@ -67,7 +182,18 @@ def verify_webhook_signature(
             print(f"Unsupported signature version: {version}")
             return False
 
-        print(f"Expected signature: {expected_signature}")
+        # Svix signatures are base64-encoded HMAC-SHA256 digests (32 bytes).
+        # Reject malformed values before spending any time on the HMAC.
+        try:
+            expected_bytes = base64.b64decode(expected_signature, validate=True)
+        except binascii.Error:
+            print("Invalid signature encoding")
+            return False
+
+        if len(expected_bytes) != _SIGNATURE_DIGEST_SIZE:
+            print(f"Invalid signature length: {len(expected_bytes)}")
+            return False
+
         print(f"Message ID: {msg_id}")
         print(f"Timestamp: {timestamp}")
 
@@ -79,20 +205,10 @@ def verify_webhook_signature(
         payload_b64 = base64.b64encode(payload).decode()
         signed_payload = f"{msg_id}.{timestamp}.{payload_b64}"
 
-        print(f"Signed payload: {signed_payload[:100]}...")
-
-        # Compute the expected signature using HMAC-SHA256
-        computed_signature = hmac.new(
-            secret_bytes, signed_payload.encode("utf-8"), hashlib.sha256
-        ).digest()
+        # Compute the expected signature using HMAC-SHA256 and compare raw digests
+        computed_signature = hmac.digest(secret_bytes, signed_payload.encode("utf-8"), "sha256")
 
-        # Encode to base64 for comparison
-        computed_signature_b64 = base64.b64encode(computed_signature).decode()
-
-        print(f"Computed signature: {computed_signature_b64}")
-
-        # Compare signatures
-        is_valid = hmac.compare_digest(expected_signature, computed_signature_b64)
+        is_valid = hmac.compare_digest(expected_bytes, computed_signature)
         print(f"Signature valid: {is_valid}")
 
         return is_valid
@@ -103,6 +219,25 @@ def verify_webhook_signature(
         return False
 
 
+async def _dispatch_clerk_event(event: dict[str, Any]) -> None:
+    """Route a parsed Clerk webhook event to its handler"""
+    event_type = event.get("type")
+    event_data = event.get("data", {})
+
+    print(f"📨 Received Clerk webhook: {event_type}")
+    print(f"📋 Event data: {event_data}")
+
+    # Handle different event types
+    if event_type == "user.created":
+        await handle_user_created(event_data)
+    elif event_type == "user.updated":
+        await handle_user_updated(event_data)
+    elif event_type == "user.deleted":
+        await handle_user_deleted(event_data)
+    else:
+        print(f"Unhandled webhook event type: {event_type}")
+
+
 @webhook_router.post("/clerk")
 async def handle_clerk_webhook(request: Request):
     """
@@ -152,28 +287,39 @@ async def handle_clerk_webhook(request: Request):
             "WARNING: Signature verification skipped (SKIP_SIGNATURE_VERIFICATION=True or secret not set)"
         )
 
+    # Clerk retries on any non-2xx response, so the same svix-id can arrive more than once
+    if _is_duplicate_message(msg_id):
+        print(f"Duplicate webhook delivery ignored: {msg_id}")
+        return Response(content="Webhook already processed", status_code=200)
+
+    inflight = _inflight_msg_ids.get(msg_id) if msg_id else None
+    if inflight is not None:
+        # Another delivery of this message is still being handled; report its outcome
+        if await asyncio.shield(inflight):
+            print(f"Duplicate webhook delivery ignored: {msg_id}")
+            return Response(content="Webhook already processed", status_code=200)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Webhook processing failed",
+        )
+
+    handled: asyncio.Future[bool] | None = None
+    if msg_id:
+        handled = asyncio.get_running_loop().create_future()
+        _inflight_msg_ids[msg_id] = handled
+
     try:
         # Parse the webhook payload
-        event = json.loads(body.decode("utf-8"))
-        event_type = event.get("type")
-        event_data = event.get("data", {})
-
-        print(f"📨 Received Clerk webhook: {event_type}")
-        print(f"📋 Event data: {event_data}")
-
-        # Handle different event types
-        if event_type == "user.created":
-            await handle_user_created(event_data)
-        elif event_type == "user.updated":
-            await handle_user_updated(event_data)
-        elif event_type == "user.deleted":
-            await handle_user_deleted(event_data)
-        else:
-            print(f"Unhandled webhook event type: {event_type}")
+        await _dispatch_clerk_event(orjson.loads(body))
+
+        # Only remember the message once it was handled, so failed deliveries are retried
+        _mark_message_processed(msg_id)
+        if handled is not None:
+            handled.set_result(True)
 
         return Response(content="Webhook processed successfully", status_code=200)
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON payload"
         )
@@ -183,6 +329,31 @@ async def handle_clerk_webhook(request: Request):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Webhook processing failed: {e!s}",
         )
+    finally:
+        # Drop the marker whatever happened, so a failed delivery can be retried
+        if handled is not None:
+            _inflight_msg_ids.pop(msg_id, None)
+            if not handled.done():
+                handled.set_result(False)
+
+
+def _clerk_user_sync_from_event(user_data: dict[str, Any]) -> ClerkUserSync:
+    """Build a ClerkUserSync from the data of a user.* webhook event"""
+    primary_email = (user_data.get("email_addresses") or [{}])[0]
+    verification = primary_email.get("verification") or {}
+    first_name = user_data.get("first_name")
+    last_name = user_data.get("last_name")
+
+    return ClerkUserSync(
+        clerk_user_id=user_data.get("id"),
+        email=primary_email.get("email_address", ""),
+        email_verified=verification.get("status") == "verified",
+        username=user_data.get("username"),
+        first_name=first_name,
+        last_name=last_name,
+        full_name=f"{first_name or ''} {last_name or ''}".strip(),
+        image_url=user_data.get("image_url"),
+    )
 
 
 async def handle_user_created(user_data: dict[str, Any]):
@@ -191,22 +362,10 @@ async def handle_user_created(user_data: dict[str, Any]):
         print(f"👤 Creating new user from webhook: {user_data.get('id')}")
 
         # Extract user info from Clerk webhook data
-        clerk_user_sync = ClerkUserSync(
-            clerk_user_id=user_data.get("id"),
-            email=user_data.get("email_addresses", [{}])[0].get("email_address", ""),
-            email_verified=user_data.get("email_addresses", [{}])[0]
-            .get("verification", {})
-            .get("status")
-            == "verified",
-            username=user_data.get("username"),
-            first_name=user_data.get("first_name"),
-            last_name=user_data.get("last_name"),
-            full_name=f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip(),
-            image_url=user_data.get("image_url"),
-        )
+        clerk_user_sync = _clerk_user_sync_from_event(user_data)
 
-        # Create user in our database
-        user = await repo.sync_clerk_user(clerk_user_sync)
+        # Create user in our database (batched with concurrent deliveries)
+        user = await _user_sync_batcher.sync(clerk_user_sync)
         print(f"User created successfully: {user.email} (ID: {user.id})")
 
     except Exception as e:
@@ -220,22 +379,10 @@ async def handle_user_updated(user_data: dict[str, Any]):
         print(f"🔄 Updating user from webhook: {user_data.get('id')}")
 
         # Extract updated user info
-        clerk_user_sync = ClerkUserSync(
-            clerk_user_id=user_data.get("id"),
-            email=user_data.get("email_addresses", [{}])[0].get("email_address", ""),
-            email_verified=user_data.get("email_addresses", [{}])[0]
-            .get("verification", {})
-            .get("status")
-            == "verified",
-            username=user_data.get("username"),
-            first_name=user_data.get("first_name"),
-            last_name=user_data.get("last_name"),
-            full_name=f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip(),
-            image_url=user_data.get("image_url"),
-        )
+        clerk_user_sync = _clerk_user_sync_from_event(user_data)
 
-        # Update user in our database
-        user = await repo.sync_clerk_user(clerk_user_sync)
+        # Update user in our database (batched with concurrent deliveries)
+        user = await _user_sync_batcher.sync(clerk_user_sync)
         print(f"User updated successfully: {user.email}")
 
     except Exception as e:
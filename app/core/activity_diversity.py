@@ -2,8 +2,27 @@
 Utilities for ensuring balanced activity diversity across days.
 """
 
+import logging
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
+# Base per-day limits by category
+_CATEGORY_LIMITS = {
+    "dining": 3,  # Allow up to 3 dining experiences per day (breakfast, lunch, dinner)
+    "nightlife": 2,  # Max 2 nightlife venues per day
+    "culture": 3,  # Museums, galleries, etc. can be more
+    "outdoor": 2,  # Parks, beaches
+    "shopping": 2,  # Shopping venues
+    "entertainment": 2,  # Shows, attractions
+    "wellness": 2,  # Spas, gyms
+    "other": 2,  # General limit
+}
+_DEFAULT_CATEGORY_LIMIT = 2
+
+# High-pace trips (pace_style above this) allow +1 more per category
+_HIGH_PACE_THRESHOLD = 66
+
 
 def categorize_activity(venue_types: list[str]) -> str:
     """
@@ -157,26 +176,14 @@ def get_category_limit_for_day(
     Returns:
         Maximum count for this category
     """
-    # Base limits by category
-    category_limits = {
-        "dining": 3,  # Allow up to 3 dining experiences per day (breakfast, lunch, dinner)
-        "nightlife": 2,  # Max 2 nightlife venues per day
-        "culture": 3,  # Museums, galleries, etc. can be more
-        "outdoor": 2,  # Parks, beaches
-        "shopping": 2,  # Shopping venues
-        "entertainment": 2,  # Shows, attractions
-        "wellness": 2,  # Spas, gyms
-        "other": 2,  # General limit
-    }
-
-    base_limit = category_limits.get(category, 2)
+    base_limit = _CATEGORY_LIMITS.get(category, _DEFAULT_CATEGORY_LIMIT)
 
     # For high-pace trips, allow +1 more per category
-    if pace_style > 66:
+    if pace_style > _HIGH_PACE_THRESHOLD:
         base_limit += 1
 
     # Cap at 40% of total activities (prevents one category dominating)
-    max_limit = max(2, int(total_activities * 0.4))
+    max_limit = max(2, (total_activities * 2) // 5)
 
     return min(base_limit, max_limit)
 
@@ -203,9 +210,14 @@ def distribute_venues_with_diversity(
     days_venues: list[list[dict[str, Any]]] = [[] for _ in range(num_days)]
     day_category_counts: list[dict[str, int]] = [{} for _ in range(num_days)]
 
+    # Per-day category limits only depend on the day's size, so compute them once
+    pace_bonus = 1 if pace_style > _HIGH_PACE_THRESHOLD else 0
+    day_max_limits = [max(2, (count * 2) // 5) for count in activities_per_day]
+
     # Assign venues one by one, choosing day with lowest count for that category
     for venue in venues:
         category = categorize_activity(venue.get("types", []))
+        category_limit = _CATEGORY_LIMITS.get(category, _DEFAULT_CATEGORY_LIMIT) + pace_bonus
 
         # Find best day for this venue
         best_day_idx = None
@@ -218,9 +230,7 @@ def distribute_venues_with_diversity(
 
             # Check category limit for this day
             current_count = day_category_counts[day_idx].get(category, 0)
-            limit = get_category_limit_for_day(
-                category, activities_per_day[day_idx], pace_style
-            )
+            limit = min(category_limit, day_max_limits[day_idx])
 
             if current_count >= limit:
                 continue
@@ -246,15 +256,22 @@ def distribute_venues_with_diversity(
                     day_category_counts[day_with_space].get(category, 0) + 1
                 )
 
-    # Log diversity scores
-    for day_idx, day_venues in enumerate(days_venues):
-        diversity = calculate_diversity_score(day_venues)
-        categories = {}
-        for v in day_venues:
-            cat = categorize_activity(v.get("types", []))
-            categories[cat] = categories.get(cat, 0) + 1
-        print(
-            f"[Diversity] Day {day_idx+1}: {len(day_venues)} activities, diversity={diversity:.2f}, categories={categories}"
-        )
+    # Log diversity scores (reusing the category counts maintained above)
+    if logger.isEnabledFor(logging.DEBUG):
+        for day_idx, day_venues in enumerate(days_venues):
+            categories = day_category_counts[day_idx]
+            max_possible_categories = min(len(day_venues), 7)
+            diversity = (
+                min(1.0, len(categories) / max_possible_categories)
+                if max_possible_categories > 0
+                else 1.0
+            )
+            logger.debug(
+                "[Diversity] Day %d: %d activities, diversity=%.2f, categories=%s",
+                day_idx + 1,
+                len(day_venues),
+                diversity,
+                categories,
+            )
 
     return days_venues
@@ -1,19 +1,127 @@
+import asyncio
+import hashlib
 import logging
 import os
+import re
+import time
 from typing import Any
 
 import httpx
-from jose import JWTError, jwt
+import jwt
+import orjson
+from jwt import InvalidTokenError, PyJWK
+
+from app.core.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 # Clerk configuration
 CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
 CLERK_PUBLISHABLE_KEY = os.getenv("CLERK_PUBLISHABLE_KEY", "")
-
-# Cache for Clerk's public keys
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL")
+CLERK_INSTANCE_URL = (os.getenv("CLERK_INSTANCE_URL") or "").rstrip("/")
+IS_DEV = os.getenv("ENVIRONMENT", "development").lower() == "development"
+
+# Headers for Clerk Backend API calls (the secret key is fixed for the process)
+_CLERK_API_HEADERS = {
+    "Authorization": f"Bearer {CLERK_SECRET_KEY}",
+    "Content-Type": "application/json",
+}
+
+# JWKS endpoint: explicit URL first, else derived from the instance URL
+_JWKS_URL = CLERK_JWKS_URL or (
+    f"{CLERK_INSTANCE_URL}/.well-known/jwks.json" if CLERK_INSTANCE_URL else None
+)
+
+# Cache for Clerk's public keys:
+# {"raw": <JWKS>, "keys_by_kid": {kid: <constructed key>}, "etag": str | None,
+#  "expires_at": float, "fetched_at": float} (times from time.monotonic())
 _clerk_jwks_cache: dict[str, Any] | None = None
 
+# JWKS freshness when the response has no Cache-Control max-age
+JWKS_DEFAULT_MAX_AGE_SECONDS = 60 * 60
+# Minimum time between forced refetches (unknown kid), to bound refetch traffic
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 60
+# After a failed JWKS fetch, keep serving the stale keys (if any) for this long
+# before trying again, so an outage doesn't turn every request into a refetch
+JWKS_FAILURE_BACKOFF_SECONDS = 30
+# time.monotonic() before which no JWKS refetch is attempted after a failure
+_jwks_retry_at = 0.0
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+# Serializes JWKS fetches so concurrent cache misses share one request
+_jwks_lock = asyncio.Lock()
+
+# Clock skew tolerated on exp/iat/nbf, matching Clerk's own SDKs
+JWT_CLOCK_SKEW_SECONDS = 5
+
+# Signature-verified token payloads, keyed by a hash of the token. Entries never
+# outlive the token's own exp claim.
+VERIFIED_TOKEN_CACHE_TTL_SECONDS = 300
+_verified_token_cache = TTLCache(maxsize=10_000, ttl=VERIFIED_TOKEN_CACHE_TTL_SECONDS)
+
+
+# Shared HTTP client for JWKS and Clerk API calls, so connections and TLS
+# sessions are reused across requests. Closed on app shutdown and recreated
+# on next use, so a restarted lifespan doesn't reuse a closed client.
+_clerk_http: httpx.AsyncClient | None = None
+
+
+def _get_clerk_http() -> httpx.AsyncClient:
+    """Return the shared Clerk HTTP client, creating it if missing or closed."""
+    global _clerk_http
+    if _clerk_http is None or _clerk_http.is_closed:
+        _clerk_http = httpx.AsyncClient(
+            timeout=5.0, limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _clerk_http
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def _jwks_max_age(response: httpx.Response) -> int:
+    """Seconds the JWKS response may be cached for, from Cache-Control."""
+    match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+    return int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE_SECONDS
+
+
+def _fresh_jwks_cache(force: bool = False) -> dict[str, Any] | None:
+    """
+    Return the cached JWKS if it can be used without refetching.
+
+    Normally that means it has not expired; for a forced refresh, that it was
+    fetched less than JWKS_MIN_REFRESH_INTERVAL_SECONDS ago.
+    """
+    if not _clerk_jwks_cache:
+        return None
+    now = time.monotonic()
+    if force:
+        if now - _clerk_jwks_cache["fetched_at"] < JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+            return _clerk_jwks_cache
+    elif now < _clerk_jwks_cache["expires_at"]:
+        return _clerk_jwks_cache
+    return None
+
+
+def _jwks_backing_off() -> bool:
+    """Whether a recent JWKS fetch failed and the next attempt should wait."""
+    return time.monotonic() < _jwks_retry_at
+
+
+def _construct_signing_keys(jwks: dict[str, Any]) -> dict[str, Any]:
+    """Build verification key objects for every JWK in the set, keyed by kid."""
+    keys_by_kid: dict[str, Any] = {}
+    for jwk_dict in jwks.get("keys", []):
+        kid = jwk_dict.get("kid")
+        if not kid:
+            continue
+        try:
+            keys_by_kid[kid] = PyJWK(jwk_dict).key
+        except Exception as e:
+            logger.error(f"Error converting JWK {kid}: {e}", exc_info=True)
+    return keys_by_kid
+
 
 class ClerkAuth:
     """Clerk authentication helper class"""
@@ -22,17 +130,26 @@ class ClerkAuth:
         if not CLERK_SECRET_KEY:
             raise ValueError("CLERK_SECRET_KEY environment variable is required")
 
-    async def _get_clerk_jwks(self) -> dict[str, Any] | None:
+    async def _get_clerk_jwks(self, force: bool = False) -> dict[str, Any] | None:
         """
         Fetch Clerk's JWKS (JSON Web Key Set) for JWT verification.
 
+        The JWKS is cached for the response's Cache-Control max-age and then
+        revalidated with If-None-Match. force=True refetches early (e.g. when a
+        token's kid is unknown after key rotation), at most once per
+        JWKS_MIN_REFRESH_INTERVAL_SECONDS.
+
+        Args:
+            force: Refetch even if the cached JWKS has not expired yet
+
         Returns:
-            JWKS dictionary with public keys
+            Dict with the raw JWKS ("raw") and verification keys by kid ("keys_by_kid")
         """
-        global _clerk_jwks_cache
-
-        # Use cache if available
-        if _clerk_jwks_cache:
+        # Use cache if still fresh
+        cached = _fresh_jwks_cache(force)
+        if cached:
+            return cached
+        if _jwks_backing_off():
             return _clerk_jwks_cache
 
         try:
@@ -41,45 +158,24 @@ class ClerkAuth:
             # In development, we'll skip JWKS verification and use dev mode fallback
             # In production, you should set CLERK_INSTANCE_URL or CLERK_JWKS_URL
 
-            jwks_url = None
-
-            # Try to get JWKS URL from environment variable first
-            clerk_jwks_url = os.getenv("CLERK_JWKS_URL")
-            if clerk_jwks_url:
-                jwks_url = clerk_jwks_url
-            else:
-                # Try to construct from instance URL if available
-                clerk_instance_url = os.getenv("CLERK_INSTANCE_URL")
-                if clerk_instance_url:
-                    # Remove trailing slash if present
-                    instance_url = clerk_instance_url.rstrip("/")
-                    jwks_url = f"{instance_url}/.well-known/jwks.json"
-                elif CLERK_PUBLISHABLE_KEY:
-                    # Try to extract instance from publishable key
-                    # Format: pk_test_<instance-id> or pk_live_<instance-id>
-                    # But this doesn't give us the full domain
-                    # For now, skip JWKS in dev mode (we'll use unverified decoding)
-                    is_dev = (
-                        os.getenv("ENVIRONMENT", "development").lower() == "development"
-                    )
-                    if is_dev:
+            jwks_url = _JWKS_URL
+            if not jwks_url:
+                if CLERK_PUBLISHABLE_KEY:
+                    # Publishable keys (pk_test_<id> / pk_live_<id>) don't give us the
+                    # full domain. For now, skip JWKS in dev mode (we'll use unverified decoding)
+                    if IS_DEV:
                         logger.debug(
                             "Development mode: Skipping JWKS verification. "
                             "Set CLERK_JWKS_URL or CLERK_INSTANCE_URL for production."
                         )
-                        return None
                     else:
                         logger.warning(
                             "Cannot construct JWKS URL from publishable key. "
                             "Set CLERK_JWKS_URL or CLERK_INSTANCE_URL environment variable."
                         )
-                        return None
                 else:
                     # No publishable key - can't verify JWKS
-                    is_dev = (
-                        os.getenv("ENVIRONMENT", "development").lower() == "development"
-                    )
-                    if is_dev:
+                    if IS_DEV:
                         logger.debug(
                             "Development mode: No CLERK_PUBLISHABLE_KEY set, skipping JWKS verification"
                         )
@@ -87,23 +183,56 @@ class ClerkAuth:
                         logger.warning(
                             "No CLERK_PUBLISHABLE_KEY set, skipping JWKS verification"
                         )
-                    return None
-
-            if not jwks_url:
                 return None
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(jwks_url, timeout=5.0)
-                if response.status_code == 200:
-                    jwks = response.json()
-                    _clerk_jwks_cache = jwks
-                    return jwks
-                else:
-                    logger.error(f"Failed to fetch JWKS: {response.status_code}")
-                    return None
+            # Single-flight: concurrent misses wait for one fetch instead of each
+            # fetching, then re-check the cache the winner just filled
+            async with _jwks_lock:
+                cached = _fresh_jwks_cache(force)
+                if cached:
+                    return cached
+                if _jwks_backing_off():
+                    return _clerk_jwks_cache
+                return await self._fetch_clerk_jwks(jwks_url)
         except Exception as e:
             logger.error(f"Error fetching JWKS: {e}", exc_info=True)
-            return None
+            return _clerk_jwks_cache
+
+    async def _fetch_clerk_jwks(self, jwks_url: str) -> dict[str, Any] | None:
+        """Fetch (or revalidate) the JWKS and update the module cache."""
+        global _clerk_jwks_cache, _jwks_retry_at
+
+        try:
+            headers = {}
+            if _clerk_jwks_cache and _clerk_jwks_cache.get("etag"):
+                headers["If-None-Match"] = _clerk_jwks_cache["etag"]
+
+            response = await _get_clerk_http().get(jwks_url, headers=headers)
+            now = time.monotonic()
+            if response.status_code == 304 and _clerk_jwks_cache:
+                # Keys unchanged - just extend the cached copy
+                _clerk_jwks_cache["fetched_at"] = now
+                _clerk_jwks_cache["expires_at"] = now + _jwks_max_age(response)
+                return _clerk_jwks_cache
+            elif response.status_code == 200:
+                jwks = orjson.loads(response.content)
+                _clerk_jwks_cache = {
+                    "raw": jwks,
+                    "keys_by_kid": _construct_signing_keys(jwks),
+                    "etag": response.headers.get("etag"),
+                    "fetched_at": now,
+                    "expires_at": now + _jwks_max_age(response),
+                }
+                return _clerk_jwks_cache
+            else:
+                logger.error(f"Failed to fetch JWKS: {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching JWKS: {e}", exc_info=True)
+
+        # Keep verifying with the previous keys rather than failing all requests,
+        # and back off before the next fetch
+        _jwks_retry_at = time.monotonic() + JWKS_FAILURE_BACKOFF_SECONDS
+        return _clerk_jwks_cache
 
     async def verify_clerk_token(self, token: str) -> dict[str, Any] | None:
         """
@@ -123,68 +252,75 @@ class ClerkAuth:
             if token.startswith("Bearer "):
                 token = token[7:]
 
-            # Decode header to get key ID (kid)
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get("kid")
+            # Cheap structural check: a JWS has three non-empty dot-separated segments
+            parts = token.split(".")
+            if len(parts) != 3 or not all(parts):
+                logger.debug("Rejecting malformed token")
+                return None
+
+            # Reuse the payload if this exact token was already verified
+            cache_key = _token_cache_key(token)
+            cached_payload = _verified_token_cache.get(cache_key)
+            if cached_payload is not None and cached_payload.get("exp", 0) > time.time():
+                return cached_payload
 
             # Try to verify signature using Clerk's public keys
             jwks = await self._get_clerk_jwks()
 
-            if jwks and kid:
-                # Find the matching key
-                key = None
-                for jwk in jwks.get("keys", []):
-                    if jwk.get("kid") == kid:
-                        key = jwk
-                        break
-
-                if key:
-                    try:
-                        # Import cryptography for JWK to RSA key conversion
-                        from jose import jwk
-
-                        # Convert JWK to RSA key
-                        rsa_key = jwk.construct(key)
-
-                        # Verify token signature
-                        payload = jwt.decode(
-                            token,
-                            rsa_key,
-                            algorithms=["RS256"],  # Clerk uses RS256
-                            options={
-                                "verify_signature": True,
-                                "verify_exp": True,
-                                "verify_iat": True,
-                            },
-                        )
-                        return payload
-                    except JWTError as e:
-                        logger.warning(f"JWT verification failed: {e}")
-                        # Fall through to fallback for development
-                    except Exception as e:
-                        logger.error(f"Error converting JWK: {e}", exc_info=True)
-                        # Fall through to fallback for development
+            # The header is only needed to pick the signing key (kid)
+            kid = jwt.get_unverified_header(token).get("kid") if jwks else None
 
-            # Fallback: For development, decode without verification
-            # TODO: Remove this fallback in production or make it configurable
-            is_dev = os.getenv("ENVIRONMENT", "development").lower() == "development"
-            if is_dev:
-                logger.debug(
-                    "Using development mode: decoding without signature verification"
-                )
+            # Unknown kid usually means Clerk rotated its keys - refetch once
+            if jwks and kid and kid not in jwks["keys_by_kid"]:
+                jwks = await self._get_clerk_jwks(force=True)
+
+            # Key objects are built once per JWKS fetch, not per request
+            rsa_key = jwks["keys_by_kid"].get(kid) if jwks and kid else None
+
+            if rsa_key is not None:
                 try:
-                    payload = jwt.decode(
+                    # Verify token signature (CPU-bound RSA verify, keep it off the event loop)
+                    payload = await asyncio.to_thread(
+                        jwt.decode,
                         token,
-                        key="",  # Empty string when skipping verification
+                        rsa_key,
+                        algorithms=["RS256"],  # Clerk uses RS256
+                        leeway=JWT_CLOCK_SKEW_SECONDS,
                         options={
-                            "verify_signature": False,  # Skip signature verification in dev
-                            "verify_exp": False,  # Skip expiration check in dev too
+                            "verify_signature": True,
+                            "verify_exp": True,
+                            "verify_iat": True,
                         },
                     )
-                    logger.debug(
-                        f"Successfully decoded token. Payload keys: {list(payload.keys())}"
+
+                    ttl = min(
+                        VERIFIED_TOKEN_CACHE_TTL_SECONDS,
+                        payload.get("exp", 0) - time.time(),
                     )
-                    logger.debug(f"Payload contents: {payload}")
+                    if ttl > 0:
+                        _verified_token_cache.set(cache_key, payload, ttl=ttl)
+                    return payload
+                except InvalidTokenError as e:
+                    logger.warning(f"JWT verification failed: {e}")
+                    # Fall through to fallback for development
+                except Exception as e:
+                    logger.error(f"Error verifying token signature: {e}", exc_info=True)
+                    # Fall through to fallback for development
+
+            # Fallback: For development, decode without verification
+            # TODO: Remove this fallback in production or make it configurable
+            if IS_DEV:
+                logger.debug(
+                    "Using development mode: decoding without signature verification"
+                )
+                try:
+                    # No signature or expiration checks in dev
+                    payload = jwt.decode(token, options={"verify_signature": False})
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Successfully decoded token. Payload keys: %s", list(payload)
+                        )
+                        logger.debug("Payload contents: %s", payload)
                     return payload
                 except Exception as decode_error:
                     logger.error(
@@ -198,7 +334,7 @@ class ClerkAuth:
                 )
                 return None
 
-        except JWTError as e:
+        except InvalidTokenError as e:
             logger.error(f"JWT Error: {e}")
             return None
         except Exception as e:
@@ -216,27 +352,34 @@ class ClerkAuth:
             User information from Clerk API
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.clerk.dev/v1/users/{user_id}",
-                    headers={
-                        "Authorization": f"Bearer {CLERK_SECRET_KEY}",
-                        "Content-Type": "application/json",
-                    },
-                )
+            response = await _get_clerk_http().get(
+                f"https://api.clerk.dev/v1/users/{user_id}",
+                headers=_CLERK_API_HEADERS,
+            )
 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(
-                        f"Clerk API error: {response.status_code} - {response.text}"
-                    )
-                    return None
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+            else:
+                logger.error(
+                    f"Clerk API error: {response.status_code} - {response.text}"
+                )
+                return None
 
         except Exception as e:
             logger.error(f"Error fetching user from Clerk: {e}", exc_info=True)
             return None
 
+    async def warm_up(self) -> None:
+        """Populate the JWKS cache ahead of the first request (called on app startup)."""
+        await self._get_clerk_jwks()
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client (called on app shutdown)."""
+        global _clerk_http
+        if _clerk_http is not None:
+            await _clerk_http.aclose()
+            _clerk_http = None
+
     def extract_user_data(self, clerk_payload: dict[str, Any]) -> dict[str, Any]:
         """
         Extract standardized user data from Clerk token payload
@@ -247,35 +390,34 @@ class ClerkAuth:
         Returns:
             Standardized user data dictionary
         """
-        first_name = (
-            clerk_payload.get("given_name") or clerk_payload.get("first_name") or ""
-        )
-        last_name = (
-            clerk_payload.get("family_name") or clerk_payload.get("last_name") or ""
-        )
-
-        if (not first_name or not last_name) and clerk_payload.get("name"):
-            name_parts = clerk_payload.get("name", "").strip().split()
+        get = clerk_payload.get
+        first_name = get("given_name") or get("first_name") or ""
+        last_name = get("family_name") or get("last_name") or ""
+        name = get("name")
+
+        # Only split the display name when a name part is actually missing
+        if name and not (first_name and last_name):
+            name_parts = name.split()
             if name_parts:
                 first_name = first_name or name_parts[0]
                 if len(name_parts) > 1:
                     last_name = last_name or " ".join(name_parts[1:])
 
-        first_name = first_name.strip()
-        last_name = last_name.strip()
-        full_name = clerk_payload.get("name") or f"{first_name} {last_name}".strip()
+        first_name = first_name.strip() or None
+        last_name = last_name.strip() or None
+        full_name = name or " ".join(part for part in (first_name, last_name) if part)
 
         # Extract common fields from Clerk token
         return {
-            "clerk_user_id": clerk_payload.get("sub"),  # Clerk user ID
-            "email": clerk_payload.get("email"),
-            "email_verified": clerk_payload.get("email_verified", False),
-            "username": clerk_payload.get("username"),
-            "first_name": first_name or None,
-            "last_name": last_name or None,
-            "full_name": full_name if full_name else None,
-            "image_url": clerk_payload.get("picture"),
-            "created_at": clerk_payload.get("iat"),  # Issued at time
+            "clerk_user_id": get("sub"),  # Clerk user ID
+            "email": get("email"),
+            "email_verified": get("email_verified", False),
+            "username": get("username"),
+            "first_name": first_name,
+            "last_name": last_name,
+            "full_name": full_name or None,
+            "image_url": get("picture"),
+            "created_at": get("iat"),  # Issued at time
         }
 
 
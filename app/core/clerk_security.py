@@ -3,7 +3,7 @@ import logging
 from app.core.clerk_auth import clerk_auth
 from app.core.repository import repo
 from app.core.schemas import ClerkUserSync, User
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 logger = logging.getLogger(__name__)
@@ -12,6 +12,7 @@ security = HTTPBearer()
 
 
 async def get_current_user_from_clerk(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> User:
     """
@@ -21,7 +22,14 @@ async def get_current_user_from_clerk(
     1. Verifies the Clerk JWT token
     2. Syncs user data to MongoDB if needed
     3. Returns the user from our database
+
+    The resolved user is stored on request.state, so other auth dependencies in
+    the same request reuse it instead of verifying the token again.
     """
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -39,7 +47,9 @@ async def get_current_user_from_clerk(
         user_data = clerk_auth.extract_user_data(clerk_payload)
 
         logger.debug(
-            f"Extracted user data: clerk_user_id={user_data.get('clerk_user_id')}, email={user_data.get('email')}"
+            "Extracted user data: clerk_user_id=%s, email=%s",
+            user_data.get("clerk_user_id"),
+            user_data.get("email"),
         )
 
         # If email is missing from token, fetch from Clerk API
@@ -69,16 +79,18 @@ async def get_current_user_from_clerk(
             raise credentials_exception
 
         # Check if user exists in our database
-        existing_user = await repo.get_user_by_clerk_id(user_data["clerk_user_id"])
+        existing_user = await repo.get_user_by_clerk_id_cached(user_data["clerk_user_id"])
 
         if existing_user:
             # User exists, return it
-            return existing_user
+            user = existing_user
         else:
             # User doesn't exist, sync from Clerk
             clerk_user_data = ClerkUserSync(**user_data)
-            synced_user = await repo.sync_clerk_user(clerk_user_data)
-            return synced_user
+            user = await repo.sync_clerk_user(clerk_user_data)
+
+        request.state.current_user = user
+        return user
 
     except HTTPException:
         raise
@@ -88,6 +100,7 @@ async def get_current_user_from_clerk(
 
 
 async def get_current_user_optional(
+    request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(
         HTTPBearer(auto_error=False)
     ),
@@ -100,7 +113,7 @@ async def get_current_user_optional(
         return None
 
     try:
-        return await get_current_user_from_clerk(credentials)
+        return await get_current_user_from_clerk(request, credentials)
     except HTTPException:
         return None
 
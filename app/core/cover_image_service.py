@@ -2,16 +2,53 @@
 Cover image service using Unsplash API with caching.
 """
 
+import asyncio
+import logging
 import os
+import threading
 from typing import Any
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.ttl_cache import TTLCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
 UNSPLASH_API_BASE = "https://api.unsplash.com"
+_SEARCH_URL = f"{UNSPLASH_API_BASE}/search/photos"
+# Query parameters shared by every photo search
+_SEARCH_PARAMS = {
+    "per_page": 1,  # Just get first result
+    "orientation": "landscape",  # Prefer landscape for covers
+}
+
+# Image URLs found for a destination are kept in-process in front of the
+# MongoDB cache; misses are not cached so they are retried
+COVER_IMAGE_CACHE_TTL_SECONDS = 3600
+
+# Shared session so Unsplash calls reuse pooled keep-alive connections instead
+# of a new TCP+TLS handshake per lookup; transient errors get two quick retries
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+        ),
+    ),
+)
 
 
 class CoverImageService:
@@ -19,11 +56,20 @@ class CoverImageService:
 
     def __init__(self):
         if not UNSPLASH_ACCESS_KEY:
-            print(
-                "[CoverImage] WARNING: UNSPLASH_ACCESS_KEY not found. "
-                "Cover images will not be available."
-            )
+            logger.warning("UNSPLASH_ACCESS_KEY not found. Cover images will not be available.")
         self.access_key = UNSPLASH_ACCESS_KEY
+        self._session = _session
+        self._url_cache = TTLCache(maxsize=1024, ttl=COVER_IMAGE_CACHE_TTL_SECONDS)
+        # get_cover_image runs in worker threads via aget_cover_image
+        self._url_cache_lock = threading.Lock()
+        # normalized destination -> future for a lookup that is already running
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _normalize(destination: str) -> str:
+        """Canonical cache key: lowercase, single spaces, ", " between parts."""
+        parts = (" ".join(part.split()) for part in destination.lower().split(","))
+        return ", ".join(part for part in parts if part)
 
     def extract_city_country(self, destination: str) -> tuple[str, str]:
         """Extract city and country from destination string."""
@@ -39,7 +85,7 @@ class CoverImageService:
         Get cover image URL for a destination.
 
         Flow:
-        1. Check database cache
+        1. Check in-process and database cache
         2. If not found, call Unsplash API
         3. Store in database
         4. Return image URL
@@ -55,39 +101,42 @@ class CoverImageService:
             return None
 
         if not self.access_key:
-            print("[CoverImage] No API key available")
+            logger.debug("No Unsplash API key available")
             return None
 
-        # Step 1: Check database cache
+        # Step 1: Check in-process cache, then database cache
+        # "Lagos, Nigeria" and "lagos,nigeria " share one cached image
+        cache_key = self._normalize(destination)
+        with self._url_cache_lock:
+            image_url = self._url_cache.get(cache_key)
+        if image_url:
+            return image_url
+
         try:
-            cached = repository.get_cover_image(destination)
+            cached = repository.get_cover_image(cache_key)
             if cached and cached.get("image_url"):
-                print(f"[CoverImage] Using cached image for '{destination}'")
+                logger.debug("Using cached image for %r", destination)
+                with self._url_cache_lock:
+                    self._url_cache.set(cache_key, cached["image_url"])
                 return cached["image_url"]
         except Exception as e:
-            print(f"[CoverImage] Cache lookup failed: {e}, proceeding to API")
+            logger.warning("Cover image cache lookup failed: %s, proceeding to API", e)
 
         # Step 2: Call Unsplash API
         city, country = self.extract_city_country(destination)
         query = f"{destination} aerial view"
 
-        print(f"[CoverImage] Fetching from Unsplash for '{destination}'")
+        logger.info("Fetching cover image from Unsplash for %r", destination)
 
         try:
-            search_url = f"{UNSPLASH_API_BASE}/search/photos"
-            params = {
-                "query": query,
-                "client_id": self.access_key,
-                "per_page": 1,  # Just get first result
-                "orientation": "landscape",  # Prefer landscape for covers
-            }
-
-            response = requests.get(search_url, params=params, timeout=10)
+            params = {"query": query, "client_id": self.access_key, **_SEARCH_PARAMS}
+
+            response = self._session.get(_SEARCH_URL, params=params, timeout=(3.05, 10))
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
             if not data.get("results") or len(data["results"]) == 0:
-                print(f"[CoverImage] No results from Unsplash for '{destination}'")
+                logger.info("No results from Unsplash for %r", destination)
                 return None
 
             # Get first result
@@ -98,28 +147,75 @@ class CoverImageService:
 
             # Step 3: Store in database (non-blocking if it fails)
             try:
-                repository.save_cover_image(destination, city, country, photo)
+                repository.save_cover_image(cache_key, city, country, photo)
             except Exception as e:
-                print(f"[CoverImage] Failed to cache image: {e}, continuing anyway")
+                logger.warning("Failed to cache cover image: %s, continuing anyway", e)
 
             # Step 4: Return image URL
             image_url = photo.get("urls", {}).get("regular")
             if image_url:
-                print(f"[CoverImage] Successfully fetched for '{destination}'")
+                logger.debug("Fetched cover image for %r", destination)
+                with self._url_cache_lock:
+                    self._url_cache.set(cache_key, image_url)
                 return image_url
             else:
-                print(f"[CoverImage] No image URL in Unsplash response")
+                logger.warning("No image URL in Unsplash response for %r", destination)
                 return None
 
         except Exception as e:
-            print(f"[CoverImage] Error fetching from Unsplash: {e}")
+            logger.warning("Error fetching cover image from Unsplash: %s", e)
+            return None
+
+    async def aget_cover_image(self, destination: str, repository: Any) -> str | None:
+        """
+        Async wrapper around get_cover_image for use from request handlers.
+
+        In-process cache hits are answered directly; everything else (MongoDB
+        and Unsplash calls) runs in a worker thread so the event loop keeps
+        serving other requests. Concurrent lookups for the same destination
+        share one in-flight call.
+        """
+        if not destination or not self.access_key:
             return None
 
+        key = self._normalize(destination)
+        with self._url_cache_lock:
+            image_url = self._url_cache.get(key)
+        if image_url:
+            return image_url
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leading lookup was cancelled, not this one: run it ourselves
+                if inflight.cancelled():
+                    return await self.aget_cover_image(destination, repository)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            image_url = await asyncio.to_thread(self.get_cover_image, destination, repository)
+            future.set_result(image_url)
+            return image_url
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            # A cancelled leader skips the handlers above; release any waiters
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
 
 # Singleton instance (will warn if API key missing but won't crash)
 try:
     cover_image_service = CoverImageService()
 except Exception as e:
-    print(f"[CoverImage] Failed to initialize service: {e}")
+    logger.error("Failed to initialize cover image service: %s", e)
     # Create a dummy service that returns None
     cover_image_service = None
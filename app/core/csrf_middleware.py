@@ -4,81 +4,123 @@ CSRF Protection Middleware
 Validates Origin header for state-changing requests to prevent CSRF attacks.
 """
 
+import logging
 import os
-from typing import Callable
+from functools import lru_cache
+from urllib.parse import urlsplit
 
-from fastapi import HTTPException, Request, status
-from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
 
 # Allowed origins for development
-ALLOWED_ORIGINS = [
+_DEV_ORIGINS = [
     "http://localhost:3456",  # Next.js frontend
     "http://localhost:5174",  # Vite itinerary template
     "http://127.0.0.1:3456",
     "http://127.0.0.1:5174",
 ]
 
-# Add production origins from environment if set
-# For ngrok: set ALLOWED_ORIGINS=https://xxx.ngrok-free.dev
-PROD_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
-ALLOWED_ORIGINS.extend([origin.strip() for origin in PROD_ORIGINS if origin.strip()])
+
+@lru_cache(maxsize=1)
+def _load_allowed_origins() -> frozenset[str]:
+    """
+    Parse the allowed origins once, normalized (no trailing slash, lowercase)
+    so the per-request check is a single set lookup.
+    """
+    # Add production origins from environment if set
+    # For ngrok: set ALLOWED_ORIGINS=https://xxx.ngrok-free.dev
+    prod_origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
+    return frozenset(
+        origin.rstrip("/").lower()
+        for origin in _DEV_ORIGINS + [o.strip() for o in prod_origins if o.strip()]
+    )
+
+
+ALLOWED_ORIGINS = _load_allowed_origins()
 
 # State-changing HTTP methods that need CSRF protection
-STATE_CHANGING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+STATE_CHANGING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
 
+# Path prefixes exempt from the check, tested with a single str.startswith
+# call (Clerk sends webhooks from different origin)
+_SKIP_PREFIXES = ("/webhooks/",)
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+
+class CSRFProtectionMiddleware:
     """
     Middleware to validate Origin header for state-changing requests.
 
     This prevents CSRF attacks by ensuring requests come from allowed origins.
+    Implemented as plain ASGI middleware so requests that pass the check go
+    straight to the app without BaseHTTPMiddleware's extra task and streams.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip CSRF check for webhook routes (Clerk sends webhooks from different origin)
-        if request.url.path.startswith("/webhooks/"):
-            return await call_next(request)
-
-        # Only check state-changing methods
-        if request.method not in STATE_CHANGING_METHODS:
-            return await call_next(request)
-
-        # Get Origin header
-        origin = request.headers.get("Origin")
-        referer = request.headers.get("Referer")
-
-        # Allow requests without Origin (e.g., same-origin, Postman, curl)
-        # But validate Referer if Origin is missing
-        if not origin:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._allowed = _load_allowed_origins()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Only check state-changing methods on non-exempt paths
+        if scope["method"] not in STATE_CHANGING_METHODS or scope["path"].startswith(
+            _SKIP_PREFIXES
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Get Origin and Referer headers in one pass over the raw headers
+        raw_origin = None
+        raw_referer = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                raw_origin = value
+            elif name == b"referer":
+                raw_referer = value
+
+        # Allow requests with neither header (e.g., Postman, curl)
+        if not raw_origin and not raw_referer:
+            await self.app(scope, receive, send)
+            return
+
+        if raw_origin:
+            origin = raw_origin.decode("latin-1")
+        else:
             # For same-origin requests, Origin might be missing
             # Check Referer as fallback
-            if referer:
-                # Extract origin from referer
-                try:
-                    from urllib.parse import urlparse
-
-                    parsed = urlparse(referer)
-                    origin = f"{parsed.scheme}://{parsed.netloc}"
-                except Exception:
-                    pass
+            origin = None
+            try:
+                parsed = urlsplit(raw_referer.decode("latin-1"))
+                origin = f"{parsed.scheme}://{parsed.netloc}"
+            except Exception:
+                pass
 
         # If we have an origin, validate it
         if origin:
-            # Remove trailing slash for comparison
-            origin = origin.rstrip("/")
+            # Normalize the same way as ALLOWED_ORIGINS
+            if origin.endswith("/"):
+                origin = origin.rstrip("/")
+            origin = origin.lower()
 
             # Check against allowed origins
-            if origin not in ALLOWED_ORIGINS:
+            if origin not in self._allowed:
                 # Log for debugging (but don't expose in production)
-                print(
-                    f"[CSRF] Rejected request from origin: {origin}"
-                    f" (allowed: {ALLOWED_ORIGINS})"
+                logger.warning(
+                    "Rejected request from origin: %s (allowed: %s)",
+                    origin,
+                    self._allowed,
                 )
-                raise HTTPException(
+                response = JSONResponse(
+                    {"detail": "Origin not allowed"},
                     status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Origin not allowed",
                 )
+                await response(scope, receive, send)
+                return
 
         # Continue with request
-        return await call_next(request)
+        await self.app(scope, receive, send)
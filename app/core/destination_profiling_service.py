@@ -8,9 +8,47 @@ from typing import Any
 
 from app.core.places_service import PlacesService
 from app.core.repository import repo
+from app.core.ttl_cache import TTLCache
 
 # Cache TTL: 30 days
 CACHE_TTL_DAYS = 30
+# Profiles are also kept in-process for a day in front of MongoDB
+PROFILE_MEMORY_CACHE_TTL_SECONDS = 86400
+
+# Categories assumed to exist everywhere until per-city discovery is
+# implemented; built once at import
+_DEFAULT_CATEGORIES: frozenset[str] = frozenset(
+    {
+        "museum",
+        "art_gallery",
+        "tourist_attraction",
+        "park",
+        "cafe",
+        "restaurant",
+        "bar",
+        "shopping_mall",
+        "point_of_interest",
+        "church",
+        "library",
+        "movie_theater",
+        "bakery",
+        "lodging",
+        "university",
+        "aquarium",
+        "zoo",
+        "beach",
+        "spa",
+        "gym",
+        "night_club",
+        "stadium",
+        "amusement_park",
+        "hindu_temple",
+        "mosque",
+        "synagogue",
+        "theater",
+        "casino",
+    }
+)
 
 
 class DestinationProfilingService:
@@ -18,64 +56,50 @@ class DestinationProfilingService:
 
     def __init__(self):
         self.places_service = PlacesService()
+        # normalized destination -> categories
+        self._profile_cache = TTLCache(maxsize=10_000, ttl=PROFILE_MEMORY_CACHE_TTL_SECONDS)
 
-    def get_destination_profile(self, destination: str) -> set[str]:
+    @staticmethod
+    def _cache_key(destination: str) -> str:
+        return destination.strip().lower()
+
+    def get_destination_profile(self, destination: str) -> frozenset[str]:
         """
         Get the destination profile (available categories) for a city.
 
-        Checks MongoDB cache first, then fetches from Google Places API if not cached.
+        Checks the in-process and MongoDB caches first, then fetches from Google
+        Places API if not cached.
 
         Args:
             destination: City name (e.g., "Paris, France")
 
         Returns:
-            Set of Google Place type strings that exist in this destination
+            Frozenset of Google Place type strings that exist in this destination
         """
         # Check cache first
+        cache_key = self._cache_key(destination)
+        categories = self._profile_cache.get(cache_key)
+        if categories is not None:
+            return categories
+
         cached_profile = repo.get_destination_profile(destination)
         if cached_profile:
-            return cached_profile.get("categories", set())
+            categories = frozenset(cached_profile.get("categories", ()))
+            self._profile_cache.set(cache_key, categories)
+            return categories
 
         # Not cached - fetch from Google Places API
         # For now, return a default set of common categories
         # In future, we can implement actual discovery by searching broadly
-        default_categories = {
-            "museum",
-            "art_gallery",
-            "tourist_attraction",
-            "park",
-            "cafe",
-            "restaurant",
-            "bar",
-            "shopping_mall",
-            "point_of_interest",
-            "church",
-            "library",
-            "movie_theater",
-            "bakery",
-            "lodging",
-            "university",
-            "aquarium",
-            "zoo",
-            "beach",
-            "spa",
-            "gym",
-            "night_club",
-            "stadium",
-            "amusement_park",
-            "hindu_temple",
-            "mosque",
-            "synagogue",
-            "theater",
-            "casino",
-        }
+        default_categories = _DEFAULT_CATEGORIES
 
         # Cache the default profile
         repo.save_destination_profile(destination, default_categories)
+        self._profile_cache.set(cache_key, default_categories)
 
         return default_categories
 
-    def refresh_destination_profile(self, destination: str) -> set[str]:
+    def refresh_destination_profile(self, destination: str) -> frozenset[str]:
         """
         Force refresh the destination profile by fetching from Google Places API.
 
@@ -83,42 +107,14 @@ class DestinationProfilingService:
             destination: City name (e.g., "Paris, France")
 
         Returns:
-            Set of Google Place type strings that exist in this destination
+            Frozenset of Google Place type strings that exist in this destination
         """
         # For now, use default categories
         # In future, implement actual discovery
-        default_categories = {
-            "museum",
-            "art_gallery",
-            "tourist_attraction",
-            "park",
-            "cafe",
-            "restaurant",
-            "bar",
-            "shopping_mall",
-            "point_of_interest",
-            "church",
-            "library",
-            "movie_theater",
-            "bakery",
-            "lodging",
-            "university",
-            "aquarium",
-            "zoo",
-            "beach",
-            "spa",
-            "gym",
-            "night_club",
-            "stadium",
-            "amusement_park",
-            "hindu_temple",
-            "mosque",
-            "synagogue",
-            "theater",
-            "casino",
-        }
+        default_categories = _DEFAULT_CATEGORIES
 
         repo.save_destination_profile(destination, default_categories)
+        self._profile_cache.pop(self._cache_key(destination))
 
         return default_categories
 
@@ -1,18 +1,511 @@
 """Email service using Resend API."""
 
+import html
 import logging
 import os
-from typing import Optional
-
-import resend
+import random
+import re
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Optional
+
+import httpx
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Initialize Resend with API key
-resend.api_key = os.getenv("RESEND_API_KEY", "")
+RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
+RESEND_API_URL = "https://api.resend.com"
+_DEFAULT_SENDER = os.getenv("RESEND_SENDER_EMAIL", "onboarding@resend.dev")
+# From header used on every outgoing email
+_FROM_HEADER = "Traverse <app@traverse-hq.com>"
+
+# NOTE: FRONTEND_URL must be set to your public URL (e.g., ngrok URL) for emails to work
+# Emails require absolute URLs, so relative paths won't work here
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3456").rstrip("/")
+_INVITE_URL_PREFIX = f"{FRONTEND_URL}/invite/"
+
+# Cheap shape check so obviously malformed addresses never reach Resend
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Shared client for the Resend REST API, so connections and TLS sessions are
+# reused across sends instead of opening a new one per email. Closed on app
+# shutdown and recreated on next use, so a restarted lifespan can still send.
+_resend_http: Optional[httpx.Client] = None
+_resend_http_lock = threading.Lock()
+# Key sent on every request; EmailService(api_key=...) overrides the env var
+_resend_api_key = RESEND_API_KEY
+
+
+def _get_resend_http() -> httpx.Client:
+    """Return the shared Resend client, creating it if missing or closed."""
+    global _resend_http
+    with _resend_http_lock:
+        if _resend_http is None or _resend_http.is_closed:
+            _resend_http = httpx.Client(
+                base_url=RESEND_API_URL,
+                headers={
+                    "Authorization": f"Bearer {_resend_api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=20),
+            )
+        return _resend_http
+
+# Resend accepts at most this many emails per /emails/batch request
+RESEND_BATCH_LIMIT = 100
+
+# Retry policy for transient Resend failures (rate limits and gateway errors).
+# Sends run inside API requests, so the budget stays well under a minute.
+RESEND_MAX_ATTEMPTS = 4
+RESEND_BACKOFF_BASE_SECONDS = 1.0
+RESEND_BACKOFF_CAP_SECONDS = 8.0
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 429s caused by an exhausted plan quota won't clear by waiting a few seconds
+_QUOTA_ERROR_TYPES = frozenset({"daily_quota_exceeded", "monthly_quota_exceeded"})
+
+
+# Client-side cap on Resend requests per second; Resend's default team limit is 2
+_DEFAULT_RESEND_RPS = 2.0
+
+
+def _read_resend_rps() -> float:
+    """RESEND_RPS from the environment, falling back to the default if unusable."""
+    raw = os.getenv("RESEND_RPS")
+    if raw is None:
+        return _DEFAULT_RESEND_RPS
+    try:
+        rps = float(raw)
+    except ValueError:
+        rps = 0.0
+    if rps > 0:
+        return rps
+    logger.warning("Ignoring invalid RESEND_RPS=%r, using %s", raw, _DEFAULT_RESEND_RPS)
+    return _DEFAULT_RESEND_RPS
+
+
+RESEND_RPS = _read_resend_rps()
+
+
+class _TokenBucket:
+    """Thread-safe token bucket that blocks callers until a token is free."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so the next token is only free after the given delay."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+                1 - seconds * self.rate,
+            )
+            self._updated = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one becomes available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiter = _TokenBucket(RESEND_RPS)
+
+
+class ResendAPIError(Exception):
+    """Error response (or transport failure) from the Resend API."""
+
+    def __init__(
+        self,
+        status_code: int,
+        error_type: str,
+        message: str,
+        headers: Optional[httpx.Headers] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_type = error_type
+        self.headers = headers if headers is not None else httpx.Headers()
+
+
+def _rate_limit_header(headers: httpx.Headers, name: str) -> Optional[float]:
+    """Read a numeric ratelimit-* header, accepting the x- prefixed form too."""
+    value = headers.get(name) or headers.get(f"x-{name}")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _respect_rate_limit_headers(headers: httpx.Headers) -> None:
+    """Pause sends until the window resets once Resend reports it is used up."""
+    remaining = _rate_limit_header(headers, "ratelimit-remaining")
+    reset = _rate_limit_header(headers, "ratelimit-reset")
+    if remaining is None or reset is None or remaining >= 1:
+        return
+    # Capped so a bogus reset value can't stall a request indefinitely
+    _rate_limiter.pause(min(reset, RESEND_BACKOFF_CAP_SECONDS))
+
+
+def _post(path: str, payload: Any, idempotency_key: str) -> Any:
+    """POST a JSON payload to the Resend API and return the decoded response."""
+    try:
+        response = _get_resend_http().post(
+            path,
+            content=orjson.dumps(payload),
+            headers={"Idempotency-Key": idempotency_key},
+        )
+    except httpx.TransportError as e:
+        # Treated like a gateway error so the request is retried
+        raise ResendAPIError(503, "transport_error", str(e)) from e
+
+    if response.is_success:
+        _respect_rate_limit_headers(response.headers)
+        return orjson.loads(response.content) if response.content else None
+
+    try:
+        body = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    raise ResendAPIError(
+        response.status_code,
+        body.get("name", "application_error"),
+        body.get("message") or response.text or response.reason_phrase,
+        response.headers,
+    )
+
+
+def _is_valid_email(address: str) -> bool:
+    """Whether an address looks deliverable enough to send to; logs if not."""
+    if address and _EMAIL_RE.match(address):
+        return True
+    logger.warning("Skipping email to invalid address: %r", address)
+    return False
+
+
+def _is_retryable(error: ResendAPIError) -> bool:
+    """Whether a Resend error is transient and worth retrying."""
+    return (
+        error.status_code in _RETRYABLE_STATUS_CODES
+        and error.error_type not in _QUOTA_ERROR_TYPES
+    )
+
+
+def _retry_delay(error: ResendAPIError, attempt: int) -> float:
+    """Exponential backoff with jitter, never shorter than Retry-After."""
+    delay = min(RESEND_BACKOFF_CAP_SECONDS, RESEND_BACKOFF_BASE_SECONDS * 2**attempt)
+    delay += random.uniform(0, 1)
+    retry_after = error.headers.get("retry-after")
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+def _send_with_retry(path: str, params: Any) -> Any:
+    """
+    POST to a Resend send endpoint, retrying rate limits and transient errors.
+
+    Args:
+        path: "/emails" or "/emails/batch"
+        params: JSON payload for the endpoint
+
+    Returns:
+        The Resend response
+    """
+    # One key per logical send, reused on every attempt, so Resend drops a retry
+    # whose earlier attempt was accepted but whose response never arrived
+    idempotency_key = str(uuid.uuid4())
+    for attempt in range(RESEND_MAX_ATTEMPTS):
+        _rate_limiter.acquire()
+        try:
+            return _post(path, params, idempotency_key)
+        except ResendAPIError as e:
+            if attempt == RESEND_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(
+                "Resend returned %s, retrying in %.1fs (attempt %d/%d)",
+                e.status_code,
+                delay,
+                attempt + 1,
+                RESEND_MAX_ATTEMPTS,
+            )
+            time.sleep(delay)
+
+
+# Email bodies, built once at import and filled per send with str.format.
+# Placeholders are the {field} names passed by the send methods below; the
+# arrow icons (Lucide-style inline SVG) and feedback link are constant and
+# already inlined.
+
+_INVITE_HTML = """\
+<!DOCTYPE html>
+<html>
+    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {first_name},</p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                <strong style="font-weight: 600;">{organizer_name}</strong> just started a trip — <strong style="font-weight: 600;">"{trip_name}"</strong> — and wants you in.
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 24px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                <span style="display: inline-block; vertical-align: middle; margin-right: 8px;"><svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" style="vertical-align: middle; margin-left: 4px; display: inline-block;"><path d="M5 12h14M12 5l7 7-7 7"/></svg></span>Tap below to <strong style="font-weight: 600;">add your available dates</strong> and help the group lock in the trip:
+            </p>
+
+            <div style="margin: 32px 0; text-align: center;">
+                <a href="{invite_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+                    Add My Dates <svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round" style="vertical-align: middle; margin-left: 6px; display: inline-block;"><path d="M5 12h14M12 5l7 7-7 7"/></svg>
+                </a>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Once everyone's in, you'll let us build your itinerary — all in minutes.
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 32px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Let's make sure this one <em>actually</em> leaves the group chat
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                — Team Traverse
+            </p>
+
+            <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
+
+            <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
+                This email was sent from an unmonitored address. Please do not reply to this email.<br>
+                If you have questions, please contact {organizer_name} directly or visit Traverse.
+            </p>
+        </div>
+    </body>
+</html>
+"""
+
+_ITINERARY_SHARE_HTML = """\
+<html>
+    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
+            <h2 style="color: #333; font-family: 'Montserrat', Arial, sans-serif;">Hey {recipient_name}!</h2>
+            <p><strong>{organizer_name}</strong> has created an itinerary for your group trip and wants to share it with you:</p>
+
+            <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <h3 style="margin-top: 0; color: #333;">{destination}</h3>
+                <p style="margin: 10px 0;"><strong>📅 Dates:</strong> {dates}</p>
+                <p style="margin: 10px 0;"><strong>⏱️ Duration:</strong> {duration}</p>
+            </div>
+
+            <p>Click the button below to view your complete itinerary:</p>
+
+            <div style="margin: 30px 0; text-align: center;">
+                <a href="{itinerary_link}" style="background-color: #a1f800; color: black; padding: 15px 40px; text-decoration: none; border-radius: 10px; font-weight: bold; font-size: 16px; display: inline-block;">
+                    View Itinerary
+                </a>
+            </div>
+
+            <p style="color: #666; font-size: 14px;">
+                Get ready for an amazing adventure! 🎉
+            </p>
+
+            <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+
+            <p style="color: #999; font-size: 12px; text-align: center;">
+                This itinerary was shared via Traverse - Your AI Travel Companion<br>
+                If you received this email by mistake, you can safely ignore it.
+            </p>
+        </div>
+    </body>
+</html>
+"""
+
+_FIRST_ITINERARY_HTML = """\
+<!DOCTYPE html>
+<html>
+    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {recipient_first_name},</p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                🎉 <strong style="font-weight: 600;">Congratulations on creating your first itinerary with Traverse!</strong>
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Your itinerary for <strong style="font-weight: 600;">{destination}</strong> is ready — packed with restaurants, activities, and hidden gems built around your preferences.
+            </p>
+
+            <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <p style="margin: 10px 0; font-size: 16px;"><strong>📅 Trip:</strong> {trip_name}</p>
+                <p style="margin: 10px 0; font-size: 16px;"><strong>🗓️ Dates:</strong> {trip_dates}</p>
+            </div>
+
+            <div style="margin: 32px 0; text-align: center;">
+                <a href="{itinerary_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+                    View your itinerary →
+                </a>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Thanks for being an early user. Your feedback helps us improve.
+            </p>
+
+            <div style="margin: 24px 0; text-align: center;">
+                <a href="https://docs.google.com/forms/d/1C7dirJFuA76XrdDW0ZOcu0SQR5BqAcwHwZcOXqUzD3c/viewform?edit_requested=true" style="color: #a1f800; text-decoration: underline; font-size: 16px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
+                    Share your feedback →
+                </a>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Let's make sure this one <em>actually</em> leaves the group chat
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                — Team Traverse
+            </p>
+
+            <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
+
+            <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
+                This email was sent from an unmonitored address. Please do not reply to this email.<br>
+                If you have questions, please visit Traverse.
+            </p>
+        </div>
+    </body>
+</html>
+"""
+
+_ALL_RESPONDED_HTML = """\
+<!DOCTYPE html>
+<html>
+    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {organizer_first_name},</p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                🎉 <strong style="font-weight: 600;">Everyone's in!</strong> Your group has submitted their dates and preferences for <strong style="font-weight: 600;">"{trip_name}"</strong> — now it's your turn to bring it all together.
+            </p>
+
+            <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <p style="margin: 10px 0; font-size: 16px;"><strong>📍 Destination:</strong> {destination}</p>
+                <p style="margin: 10px 0; font-size: 16px;"><strong>👥 Group Size:</strong> {group_size} travelers</p>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 24px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                We've analyzed everyone's inputs to suggest the best plan for your crew.
+            </p>
+
+            <div style="margin: 32px 0; text-align: center;">
+                <a href="{generate_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+                    Generate Itinerary →
+                </a>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Let's make sure this one <em>actually</em> leaves the group chat
+            </p>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                — Team Traverse
+            </p>
+
+            <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
+
+            <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
+                This email was sent from an unmonitored address. Please do not reply to this email.<br>
+                If you have questions, please visit Traverse.
+            </p>
+        </div>
+    </body>
+</html>
+"""
+
+_ITINERARY_READY_HTML = """\
+<!DOCTYPE html>
+<html>
+    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {recipient_first_name},</p>
+
+            <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
+                Your group's itinerary for <strong style="font-weight: 600;">{destination}</strong> is here — packed with restaurants, activities, and hidden gems built around your preferences.
+            </p>
+
+            <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <p style="margin: 10px 0; font-size: 16px;"><strong>📅 Trip:</strong> {trip_name}</p>
+                <p style="margin: 10px 0; font-size: 16px;"><strong>🗓️ Dates:</strong> {trip_dates}</p>
+                <p style="margin: 10px 0; font-size: 16px;"><strong>👥 Group:</strong> {group_size} travelers</p>
+            </div>
+
+            <div style="margin: 32px 0; text-align: center;">
+                <a href="{itinerary_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+                    View Itinerary →
+                </a>
+            </div>
+
+            <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
+                — Team Traverse
+            </p>
+
+            <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
+
+            <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
+                This email was sent from an unmonitored address. Please do not reply to this email.<br>
+                If you have questions, please contact {organizer_name} directly or visit Traverse.
+            </p>
+        </div>
+    </body>
+</html>
+"""
+
+
+@lru_cache(maxsize=1024)
+def _escape(value: Any) -> str:
+    """HTML-escape a user-supplied value before it is placed in an email body."""
+    return html.escape(str(value), quote=True)
+
+
+def _format_literal(value: Any) -> str:
+    """Escape a value for HTML and protect its braces from a later str.format."""
+    return _escape(value).replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=256)
+def _invite_trip_html(organizer_name: str, trip_name: str) -> str:
+    """
+    Render the parts of the invite email shared by every recipient of a trip.
+
+    Only {first_name} and {invite_link} are left as placeholders, so a group
+    invite renders the full template once and fills two fields per recipient.
+    """
+    return _INVITE_HTML.format(
+        first_name="{first_name}",
+        organizer_name=_format_literal(organizer_name),
+        trip_name=_format_literal(trip_name),
+        invite_link="{invite_link}",
+    )
 
 
 class EmailService:
@@ -29,12 +522,12 @@ class EmailService:
             sender_email: Sender email address (defaults to RESEND_SENDER_EMAIL env var or onboarding@resend.dev for testing)
         """
         if api_key:
-            resend.api_key = api_key
+            global _resend_api_key
+            _resend_api_key = api_key
+            _get_resend_http().headers["Authorization"] = f"Bearer {api_key}"
 
         # Use provided sender email, or fall back to env var, or use Resend's test domain
-        self.sender_email = sender_email or os.getenv(
-            "RESEND_SENDER_EMAIL", "onboarding@resend.dev"
-        )
+        self.sender_email = sender_email or _DEFAULT_SENDER
 
     def send_trip_invite(
         self,
@@ -65,9 +558,12 @@ class EmailService:
         Returns:
             True if email was sent successfully, False otherwise
         """
+        if not _is_valid_email(recipient_email):
+            return False
+
         try:
-            # Build the email HTML content
-            html_content = self._build_invite_email_html(
+            params = self._build_trip_invite_params(
+                recipient_email=recipient_email,
                 recipient_name=recipient_name,
                 organizer_name=organizer_name,
                 trip_name=trip_name,
@@ -78,25 +574,82 @@ class EmailService:
                 invite_link=invite_link,
             )
 
-            # Send email via Resend
-            params = {
-                "from": "Traverse <app@traverse-hq.com>",
-                "to": [recipient_email],
-                "subject": (
-                    f"{organizer_name} invited you to plan your next trip "
-                    "on Traverse ✈️"
-                ),
-                "html": html_content,
-            }
-
-            response = resend.Emails.send(params)
-            logger.info(f"Sent invite to {recipient_email}: {response}")
+            response = _send_with_retry("/emails", params)
+            logger.info("Sent invite to %s: %s", recipient_email, response)
             return True
 
         except Exception as e:
-            logger.error(f"Error sending invite to {recipient_email}: {e}")
+            logger.error("Error sending invite to %s: %s", recipient_email, e)
             return False
 
+    def send_trip_invites_batch(self, invites: list[dict]) -> list[bool]:
+        """
+        Send several trip invite emails through Resend's batch endpoint.
+
+        Args:
+            invites: Keyword-argument dicts, one per recipient, matching
+                the parameters of send_trip_invite
+
+        Returns:
+            One flag per input invite, True if that email was accepted
+        """
+        results = [False] * len(invites)
+        # Invalid addresses stay False without taking a slot in a batch
+        sendable = [
+            i
+            for i, invite in enumerate(invites)
+            if _is_valid_email(invite["recipient_email"])
+        ]
+
+        for start in range(0, len(sendable), RESEND_BATCH_LIMIT):
+            indexes = sendable[start : start + RESEND_BATCH_LIMIT]
+            chunk = [invites[i] for i in indexes]
+            recipients = [invite["recipient_email"] for invite in chunk]
+            try:
+                params = [self._build_trip_invite_params(**invite) for invite in chunk]
+                response = _send_with_retry("/emails/batch", params)
+                logger.info("Sent %d invites in one batch: %s", len(chunk), response)
+                for i in indexes:
+                    results[i] = True
+            except Exception as e:
+                logger.error("Error sending invite batch to %s: %s", recipients, e)
+
+        return results
+
+    def _build_trip_invite_params(
+        self,
+        recipient_email: str,
+        recipient_name: str,
+        organizer_name: str,
+        trip_name: str,
+        destination: Optional[str] = None,
+        date_range_start: Optional[str] = None,
+        date_range_end: Optional[str] = None,
+        custom_message: Optional[str] = None,
+        invite_link: str = "",
+    ) -> dict:
+        """Build the Resend send params for one trip invite email."""
+        html_content = self._build_invite_email_html(
+            recipient_name=recipient_name,
+            organizer_name=organizer_name,
+            trip_name=trip_name,
+            destination=destination,
+            date_range_start=date_range_start,
+            date_range_end=date_range_end,
+            custom_message=custom_message,
+            invite_link=invite_link,
+        )
+
+        return {
+            "from": _FROM_HEADER,
+            "to": [recipient_email],
+            "subject": (
+                f"{organizer_name} invited you to plan your next trip "
+                "on Traverse ✈️"
+            ),
+            "html": html_content,
+        }
+
     def send_itinerary_share(
         self,
         recipient_email: str,
@@ -122,59 +675,32 @@ class EmailService:
         Returns:
             True if email was sent successfully, False otherwise
         """
+        if not _is_valid_email(recipient_email):
+            return False
+
         try:
-            html_content = f"""
-            <html>
-                <head>
-                    <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap" rel="stylesheet">
-                </head>
-                <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
-                        <h2 style="color: #333; font-family: 'Montserrat', Arial, sans-serif;">Hey {recipient_name}!</h2>
-                        <p><strong>{organizer_name}</strong> has created an itinerary for your group trip and wants to share it with you:</p>
-                        
-                        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                            <h3 style="margin-top: 0; color: #333;">{destination}</h3>
-                            <p style="margin: 10px 0;"><strong>📅 Dates:</strong> {dates}</p>
-                            <p style="margin: 10px 0;"><strong>⏱️ Duration:</strong> {duration}</p>
-                        </div>
-
-                        <p>Click the button below to view your complete itinerary:</p>
-                        
-                        <div style="margin: 30px 0; text-align: center;">
-                            <a href="{itinerary_link}" style="background-color: #a1f800; color: black; padding: 15px 40px; text-decoration: none; border-radius: 10px; font-weight: bold; font-size: 16px; display: inline-block;">
-                                View Itinerary
-                            </a>
-                        </div>
-
-                        <p style="color: #666; font-size: 14px;">
-                            Get ready for an amazing adventure! 🎉
-                        </p>
-
-                        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                        
-                        <p style="color: #999; font-size: 12px; text-align: center;">
-                            This itinerary was shared via Traverse - Your AI Travel Companion<br>
-                            If you received this email by mistake, you can safely ignore it.
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
+            html_content = _ITINERARY_SHARE_HTML.format(
+                recipient_name=_escape(recipient_name),
+                organizer_name=_escape(organizer_name),
+                destination=_escape(destination),
+                dates=_escape(dates),
+                duration=_escape(duration),
+                itinerary_link=_escape(itinerary_link),
+            )
 
             params = {
-                "from": "Traverse <app@traverse-hq.com>",
+                "from": _FROM_HEADER,
                 "to": [recipient_email],
                 "subject": f"🗺️ Your itinerary for {destination} is ready!",
                 "html": html_content,
             }
 
-            response = resend.Emails.send(params)
-            logger.info(f"Sent itinerary share to {recipient_email}: {response}")
+            response = _send_with_retry("/emails", params)
+            logger.info("Sent itinerary share to %s: %s", recipient_email, response)
             return True
 
         except Exception as e:
-            logger.error(f"Error sending itinerary share to {recipient_email}: {e}")
+            logger.error("Error sending itinerary share to %s: %s", recipient_email, e)
             return False
 
     def _build_invite_email_html(
@@ -195,67 +721,10 @@ class EmailService:
             recipient_name.split()[0] if recipient_name.split() else recipient_name
         )
 
-        # Inline SVG arrow icon (Lucide-style) - two versions for different contexts
-        arrow_icon_inline = """
-        <svg width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" style="vertical-align: middle; margin-left: 4px; display: inline-block;">
-            <path d="M5 12h14M12 5l7 7-7 7"/>
-        </svg>
-        """
-
-        arrow_icon_button = """
-        <svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round" style="vertical-align: middle; margin-left: 6px; display: inline-block;">
-            <path d="M5 12h14M12 5l7 7-7 7"/>
-        </svg>
-        """
-
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-            <head>
-                <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap" rel="stylesheet">
-            </head>
-            <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
-                    <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {first_name},</p>
-                    
-                    <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                        <strong style="font-weight: 600;">{organizer_name}</strong> just started a trip — <strong style="font-weight: 600;">"{trip_name}"</strong> — and wants you in.
-                    </p>
-                    
-                    <p style="font-size: 16px; color: #333; margin: 0 0 24px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                        <span style="display: inline-block; vertical-align: middle; margin-right: 8px;">{arrow_icon_inline}</span>Tap below to <strong style="font-weight: 600;">add your available dates</strong> and help the group lock in the trip:
-                    </p>
-                    
-                    <div style="margin: 32px 0; text-align: center;">
-                        <a href="{invite_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-                            Add My Dates{arrow_icon_button}
-                        </a>
-                    </div>
-                    
-                    <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                        Once everyone's in, you'll let us build your itinerary — all in minutes.
-                    </p>
-                    
-                    <p style="font-size: 16px; color: #333; margin: 0 0 32px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                        Let's make sure this one <em>actually</em> leaves the group chat
-                    </p>
-                    
-                    <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                        — Team Traverse
-                    </p>
-
-                    <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
-                    
-                    <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
-                        This email was sent from an unmonitored address. Please do not reply to this email.<br>
-                        If you have questions, please contact {organizer_name} directly or visit Traverse.
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-
-        return html
+        return _invite_trip_html(organizer_name, trip_name).format(
+            first_name=_escape(first_name),
+            invite_link=_escape(invite_link),
+        )
 
     def send_first_itinerary_email(
         self,
@@ -280,81 +749,34 @@ class EmailService:
         Returns:
             True if email was sent successfully, False otherwise
         """
+        if not _is_valid_email(recipient_email):
+            return False
+
         try:
-            feedback_form_url = "https://docs.google.com/forms/d/1C7dirJFuA76XrdDW0ZOcu0SQR5BqAcwHwZcOXqUzD3c/viewform?edit_requested=true"
-
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-                <head>
-                    <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap" rel="stylesheet">
-                </head>
-                <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {recipient_first_name},</p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            🎉 <strong style="font-weight: 600;">Congratulations on creating your first itinerary with Traverse!</strong>
-                        </p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            Your itinerary for <strong style="font-weight: 600;">{destination}</strong> is ready — packed with restaurants, activities, and hidden gems built around your preferences.
-                        </p>
-                        
-                        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>📅 Trip:</strong> {trip_name}</p>
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>🗓️ Dates:</strong> {trip_dates}</p>
-                        </div>
-
-                        <div style="margin: 32px 0; text-align: center;">
-                            <a href="{itinerary_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-                                View your itinerary →
-                            </a>
-                        </div>
-
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            Thanks for being an early user. Your feedback helps us improve.
-                        </p>
-
-                        <div style="margin: 24px 0; text-align: center;">
-                            <a href="{feedback_form_url}" style="color: #a1f800; text-decoration: underline; font-size: 16px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                Share your feedback →
-                            </a>
-                        </div>
-
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            Let's make sure this one <em>actually</em> leaves the group chat
-                        </p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            — Team Traverse
-                        </p>
-
-                        <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
-                        
-                        <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
-                            This email was sent from an unmonitored address. Please do not reply to this email.<br>
-                            If you have questions, please visit Traverse.
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
+            html_content = _FIRST_ITINERARY_HTML.format(
+                recipient_first_name=_escape(recipient_first_name),
+                destination=_escape(destination),
+                trip_name=_escape(trip_name),
+                trip_dates=_escape(trip_dates),
+                itinerary_link=_escape(itinerary_link),
+            )
 
             params = {
-                "from": "Traverse <app@traverse-hq.com>",
+                "from": _FROM_HEADER,
                 "to": [recipient_email],
                 "subject": f"Your {destination} itinerary is ready",
                 "html": html_content,
             }
 
-            response = resend.Emails.send(params)
-            logger.info(f"Sent first itinerary email to {recipient_email}: {response}")
+            response = _send_with_retry("/emails", params)
+            logger.info(
+                "Sent first itinerary email to %s: %s", recipient_email, response
+            )
             return True
 
         except Exception as e:
             logger.error(
-                f"Error sending first itinerary email to {recipient_email}: {e}"
+                "Error sending first itinerary email to %s: %s", recipient_email, e
             )
             return False
 
@@ -381,71 +803,38 @@ class EmailService:
         Returns:
             True if email was sent successfully, False otherwise
         """
+        if not _is_valid_email(organizer_email):
+            return False
+
         try:
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-                <head>
-                    <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap" rel="stylesheet">
-                </head>
-                <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {organizer_first_name},</p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            🎉 <strong style="font-weight: 600;">Everyone's in!</strong> Your group has submitted their dates and preferences for <strong style="font-weight: 600;">"{trip_name}"</strong> — now it's your turn to bring it all together.
-                        </p>
-                        
-                        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>📍 Destination:</strong> {destination}</p>
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>👥 Group Size:</strong> {group_size} travelers</p>
-                        </div>
-
-                        <p style="font-size: 16px; color: #333; margin: 0 0 24px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            We've analyzed everyone's inputs to suggest the best plan for your crew.
-                        </p>
-
-                        <div style="margin: 32px 0; text-align: center;">
-                            <a href="{generate_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-                                Generate Itinerary →
-                            </a>
-                        </div>
-
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            Let's make sure this one <em>actually</em> leaves the group chat
-                        </p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            — Team Traverse
-                        </p>
-
-                        <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
-                        
-                        <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
-                            This email was sent from an unmonitored address. Please do not reply to this email.<br>
-                            If you have questions, please visit Traverse.
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
+            html_content = _ALL_RESPONDED_HTML.format(
+                organizer_first_name=_escape(organizer_first_name),
+                trip_name=_escape(trip_name),
+                destination=_escape(destination),
+                group_size=group_size,
+                generate_link=_escape(generate_link),
+            )
 
             params = {
-                "from": "Traverse <app@traverse-hq.com>",
+                "from": _FROM_HEADER,
                 "to": [organizer_email],
                 "subject": f"Your group's ready — time to finalize your {destination} trip",
                 "html": html_content,
             }
 
-            response = resend.Emails.send(params)
+            response = _send_with_retry("/emails", params)
             logger.info(
-                f"Sent all participants responded email to {organizer_email}: {response}"
+                "Sent all participants responded email to %s: %s",
+                organizer_email,
+                response,
             )
             return True
 
         except Exception as e:
             logger.error(
-                f"Error sending all participants responded email to {organizer_email}: {e}"
+                "Error sending all participants responded email to %s: %s",
+                organizer_email,
+                e,
             )
             return False
 
@@ -476,70 +865,66 @@ class EmailService:
         Returns:
             True if email was sent successfully, False otherwise
         """
+        if not _is_valid_email(recipient_email):
+            return False
+
         try:
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-                <head>
-                    <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap" rel="stylesheet">
-                </head>
-                <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; line-height: 1.6; color: #333; background-color: #ffffff;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 30px 20px;">
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">Hi {recipient_first_name},</p>
-                        
-                        <p style="font-size: 16px; color: #333; margin: 0 0 20px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            Your group's itinerary for <strong style="font-weight: 600;">{destination}</strong> is here — packed with restaurants, activities, and hidden gems built around your preferences.
-                        </p>
-                        
-                        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>📅 Trip:</strong> {trip_name}</p>
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>🗓️ Dates:</strong> {trip_dates}</p>
-                            <p style="margin: 10px 0; font-size: 16px;"><strong>👥 Group:</strong> {group_size} travelers</p>
-                        </div>
-
-                        <div style="margin: 32px 0; text-align: center;">
-                            <a href="{itinerary_link}" style="background-color: #a1f800; color: #000000; padding: 14px 32px; text-decoration: none; border-radius: 12px; font-weight: 700; font-size: 16px; display: inline-block; border: 2px solid rgba(0, 0, 0, 0.1); font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-                                View Itinerary →
-                            </a>
-                        </div>
-
-                        <p style="font-size: 16px; color: #333; margin: 32px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                            — Team Traverse
-                        </p>
-
-                        <hr style="border: none; border-top: 1px solid #eeeeee; margin: 40px 0 20px 0;">
-                        
-                        <p style="color: #999999; font-size: 12px; text-align: center; margin: 0; line-height: 1.5; font-family: 'Montserrat', Arial, sans-serif;">
-                            This email was sent from an unmonitored address. Please do not reply to this email.<br>
-                            If you have questions, please contact {organizer_name} directly or visit Traverse.
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
+            html_content = _ITINERARY_READY_HTML.format(
+                recipient_first_name=_escape(recipient_first_name),
+                destination=_escape(destination),
+                trip_name=_escape(trip_name),
+                trip_dates=_escape(trip_dates),
+                group_size=group_size,
+                itinerary_link=_escape(itinerary_link),
+                organizer_name=_escape(organizer_name),
+            )
 
             params = {
-                "from": "Traverse <app@traverse-hq.com>",
+                "from": _FROM_HEADER,
                 "to": [recipient_email],
                 "subject": f"Your {destination} itinerary is ready",
                 "html": html_content,
             }
 
-            response = resend.Emails.send(params)
-            logger.info(f"Sent itinerary ready email to {recipient_email}: {response}")
+            response = _send_with_retry("/emails", params)
+            logger.info(
+                "Sent itinerary ready email to %s: %s", recipient_email, response
+            )
             return True
 
         except Exception as e:
             logger.error(
-                f"Error sending itinerary ready email to {recipient_email}: {e}"
+                "Error sending itinerary ready email to %s: %s", recipient_email, e
             )
             return False
 
+    def close(self) -> None:
+        """Close the shared HTTP client (called on app shutdown)."""
+        global _resend_http
+        with _resend_http_lock:
+            if _resend_http is not None:
+                _resend_http.close()
+                _resend_http = None
+
 
 # Singleton instance
 email_service = EmailService()
 
 
+def _invite_link(invite_id: str) -> str:
+    """Build the absolute link a recipient uses to respond to an invite."""
+    return _INVITE_URL_PREFIX + invite_id
+
+
+def _invite_recipient_name(to_email: str, recipient_first_name: Optional[str]) -> str:
+    """Use recipient_first_name if provided, otherwise generate it from the email."""
+    if recipient_first_name and recipient_first_name.strip():
+        return recipient_first_name.strip()
+    # Fallback: extract recipient name from the email's local part
+    local = to_email.partition("@")[0]
+    return (local.replace(".", " ") if "." in local else local).title()
+
+
 def send_trip_invite_email(
     to_email: str,
     invite_id: str,
@@ -568,27 +953,60 @@ def send_trip_invite_email(
     Returns:
         True if sent successfully, False otherwise
     """
-    # Construct invite link
-    # NOTE: FRONTEND_URL must be set to your public URL (e.g., ngrok URL) for emails to work
-    # Emails require absolute URLs, so relative paths won't work here
-    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3456")
-    invite_link = f"{frontend_url}/invite/{invite_id}"
-
-    # Use recipient_first_name if provided, otherwise generate from email
-    if recipient_first_name and recipient_first_name.strip():
-        recipient_name = recipient_first_name.strip()
-    else:
-        # Fallback: extract recipient name from email
-        recipient_name = to_email.split("@")[0].replace(".", " ").title()
-
     return email_service.send_trip_invite(
         recipient_email=to_email,
-        recipient_name=recipient_name,
+        recipient_name=_invite_recipient_name(to_email, recipient_first_name),
         organizer_name=organizer_name,
         trip_name=trip_name,
         destination=destination,
         date_range_start=date_range_start,
         date_range_end=date_range_end,
         custom_message=custom_message,
-        invite_link=invite_link,
+        invite_link=_invite_link(invite_id),
     )
+
+
+def send_trip_invite_emails(
+    recipients: list[tuple[str, Optional[str]]],
+    invite_id: str,
+    organizer_name: str,
+    trip_name: str,
+    destination: Optional[str] = None,
+    date_range_start: Optional[str] = None,
+    date_range_end: Optional[str] = None,
+    custom_message: Optional[str] = None,
+) -> list[bool]:
+    """
+    Convenience function to send one trip invite to several recipients.
+
+    Emails go out through Resend's batch endpoint, up to 100 per request.
+
+    Args:
+        recipients: (email, first_name) pairs; first_name may be None
+        invite_id: Invite ID for the link
+        organizer_name: Name of the organizer
+        trip_name: Name of the trip
+        destination: Optional destination
+        date_range_start: Optional start date
+        date_range_end: Optional end date
+        custom_message: Optional custom message
+
+    Returns:
+        One flag per recipient, True if that email was sent successfully
+    """
+    invite_link = _invite_link(invite_id)
+    invites = [
+        {
+            "recipient_email": to_email,
+            "recipient_name": _invite_recipient_name(to_email, first_name),
+            "organizer_name": organizer_name,
+            "trip_name": trip_name,
+            "destination": destination,
+            "date_range_start": date_range_start,
+            "date_range_end": date_range_end,
+            "custom_message": custom_message,
+            "invite_link": invite_link,
+        }
+        for to_email, first_name in recipients
+    ]
+    return email_service.send_trip_invites_batch(invites)
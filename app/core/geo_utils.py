@@ -6,6 +6,10 @@ import math
 import random
 from typing import Any
 
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
 
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
@@ -18,7 +22,7 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     Returns:
         Distance in kilometers
     """
-    R = 6371  # Earth's radius in kilometers
+    R = EARTH_RADIUS_KM
 
     # Convert to radians
     lat1_rad = math.radians(lat1)
@@ -36,6 +40,56 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     return R * c
 
 
+def _fast_dist_sq(
+    lat: np.ndarray | float,
+    lng: np.ndarray | float,
+    ref_lat: float,
+    ref_lng: float,
+    cos_ref_lat: float,
+) -> np.ndarray | float:
+    """
+    Squared equirectangular distance (in degrees²) from a reference point.
+
+    Only for ranking nearby points: at city scale it orders candidates the
+    same way as haversine_distance without any trig per pair.
+    """
+    dlat = lat - ref_lat
+    # Wrap into [-180, 180) so points across the antimeridian stay close
+    dlng = ((lng - ref_lng + 180) % 360 - 180) * cos_ref_lat
+    return dlat * dlat + dlng * dlng
+
+
+def haversine_matrix(
+    lats1: np.ndarray | float,
+    lngs1: np.ndarray | float,
+    lats2: np.ndarray | float,
+    lngs2: np.ndarray | float,
+) -> np.ndarray:
+    """
+    Vectorized haversine_distance over NumPy arrays.
+
+    Inputs broadcast against each other, so passing shapes (V, 1) and (1, K)
+    yields the full V x K distance matrix in one call.
+
+    Returns:
+        Distances in kilometers
+    """
+    lat1_rad = np.radians(lats1)
+    lat2_rad = np.radians(lats2)
+    dlat = lat2_rad - lat1_rad
+    dlng = np.radians(np.subtract(lngs2, lngs1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _coordinate_arrays(venues: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    """Extract venue coordinates into contiguous (lats, lngs) float64 arrays."""
+    lats = np.fromiter((v["lat"] for v in venues), dtype=np.float64, count=len(venues))
+    lngs = np.fromiter((v["lng"] for v in venues), dtype=np.float64, count=len(venues))
+    return lats, lngs
+
+
 def cluster_venues_by_days(
     venues: list[dict[str, Any]], num_days: int, randomize_start: bool = True
 ) -> list[list[dict[str, Any]]]:
@@ -64,75 +118,39 @@ def cluster_venues_by_days(
             [] for _ in range(num_days - len(venues))
         ]
 
-    # Initialize cluster centers
+    lats, lngs = _coordinate_arrays(valid_venues)
+
+    # Initialize cluster centers (as indexes into valid_venues)
     if randomize_start:
-        centers = random.sample(valid_venues, num_days)
+        centers = np.array(random.sample(range(len(valid_venues)), num_days))
     else:
         # Spread centers across the venue list
         step = len(valid_venues) // num_days
-        centers = [valid_venues[i * step] for i in range(num_days)]
+        centers = np.arange(num_days) * step
 
     # K-means-like clustering (3 iterations)
     for _ in range(3):
         # Assign each venue to nearest center
-        clusters: list[list[dict[str, Any]]] = [[] for _ in range(num_days)]
-
-        for venue in valid_venues:
-            v_lat = venue["lat"]
-            v_lng = venue["lng"]
-
-            # Find nearest center
-            min_dist = float("inf")
-            nearest_idx = 0
-
-            for i, center in enumerate(centers):
-                c_lat = center["lat"]
-                c_lng = center["lng"]
-                dist = haversine_distance(v_lat, v_lng, c_lat, c_lng)
-
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest_idx = i
-
-            clusters[nearest_idx].append(venue)
-
-        # Update centers to cluster centroids
-        for i, cluster in enumerate(clusters):
-            if cluster:
-                avg_lat = sum(v["lat"] for v in cluster) / len(cluster)
-                avg_lng = sum(v["lng"] for v in cluster) / len(cluster)
-
-                # Find venue closest to centroid as new center
-                min_dist = float("inf")
-                best_venue = cluster[0]
-
-                for v in cluster:
-                    dist = haversine_distance(v["lat"], v["lng"], avg_lat, avg_lng)
-                    if dist < min_dist:
-                        min_dist = dist
-                        best_venue = v
-
-                centers[i] = best_venue
+        assignments = haversine_matrix(
+            lats[:, None], lngs[:, None], lats[centers][None, :], lngs[centers][None, :]
+        ).argmin(axis=1)
+
+        # Update centers to the venue closest to each cluster's centroid
+        for i in range(num_days):
+            members = np.flatnonzero(assignments == i)
+            if members.size:
+                dists = haversine_matrix(
+                    lats[members], lngs[members], lats[members].mean(), lngs[members].mean()
+                )
+                centers[i] = members[dists.argmin()]
 
     # Final assignment
-    final_clusters: list[list[dict[str, Any]]] = [[] for _ in range(num_days)]
-
-    for venue in valid_venues:
-        v_lat = venue["lat"]
-        v_lng = venue["lng"]
-
-        min_dist = float("inf")
-        nearest_idx = 0
-
-        for i, center in enumerate(centers):
-            c_lat = center["lat"]
-            c_lng = center["lng"]
-            dist = haversine_distance(v_lat, v_lng, c_lat, c_lng)
-
-            if dist < min_dist:
-                min_dist = dist
-                nearest_idx = i
+    assignments = haversine_matrix(
+        lats[:, None], lngs[:, None], lats[centers][None, :], lngs[centers][None, :]
+    ).argmin(axis=1)
 
+    final_clusters: list[list[dict[str, Any]]] = [[] for _ in range(num_days)]
+    for venue, nearest_idx in zip(valid_venues, assignments.tolist()):
         final_clusters[nearest_idx].append(venue)
 
     # Handle venues without coordinates (distribute evenly)
@@ -172,30 +190,24 @@ def optimize_daily_route(venues: list[dict[str, Any]]) -> list[dict[str, Any]]:
     if not valid_venues:
         return venues
 
+    lats, lngs = _coordinate_arrays(valid_venues)
+    visited = np.zeros(len(valid_venues), dtype=bool)
+
     # Start with first venue
-    route = [valid_venues[0]]
-    remaining = valid_venues[1:]
+    order = [0]
+    visited[0] = True
 
     # Nearest-neighbor: always pick closest unvisited venue
-    while remaining:
-        current = route[-1]
-        c_lat = current["lat"]
-        c_lng = current["lng"]
-
-        min_dist = float("inf")
-        nearest = remaining[0]
-
-        for venue in remaining:
-            v_lat = venue["lat"]
-            v_lng = venue["lng"]
-            dist = haversine_distance(c_lat, c_lng, v_lat, v_lng)
-
-            if dist < min_dist:
-                min_dist = dist
-                nearest = venue
-
-        route.append(nearest)
-        remaining.remove(nearest)
+    for _ in range(len(valid_venues) - 1):
+        current = order[-1]
+        dist = _fast_dist_sq(
+            lats, lngs, lats[current], lngs[current], math.cos(math.radians(lats[current]))
+        )
+        nearest = int(np.where(visited, np.inf, dist).argmin())
+        order.append(nearest)
+        visited[nearest] = True
+
+    route = [valid_venues[i] for i in order]
 
     # Append venues without coordinates at the end
     return route + invalid_venues
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+import re
+from functools import cache
 from typing import Any
 
 import aisuite as ai  # type: ignore
@@ -11,6 +13,17 @@ try:
 except Exception:
     genai = None  # optional
 
+# A reply wrapped in a ``` / ```json fence; the closing fence may be missing
+_CODE_FENCE_RE = re.compile(
+    r"^\s*```(?:json)?\s*(.*?)\s*(?:```\s*)?$", re.IGNORECASE | re.DOTALL
+)
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the body of a markdown-fenced LLM reply, or the stripped text."""
+    match = _CODE_FENCE_RE.match(text)
+    return match.group(1) if match else text.strip()
+
 
 class LLMProvider:
     def __init__(self, model: str) -> None:
@@ -34,34 +47,66 @@ class LLMProvider:
             except Exception as exc:  # fail fast if aisuite cannot initialize
                 raise RuntimeError("Failed to initialize aisuite client") from exc
 
-    def chat(self, messages: list[dict[str, Any]], temperature: float = 1.0) -> str:
-        """Send a chat completion request. messages: list of dicts with keys: role (system|user|assistant), content (str)"""
+    def chat(
+        self,
+        messages: list[dict[str, Any]],
+        temperature: float = 1.0,
+        json_mode: bool = False,
+    ) -> str:
+        """Send a chat completion request. messages: list of dicts with keys: role (system|user|assistant), content (str)
+
+        json_mode asks the backend for a bare JSON object where it supports it
+        (OpenAI response_format, Gemini response_mime_type); other backends
+        ignore it, so callers must still tolerate fenced or wrapped JSON.
+        """
         if self._genai_model is not None:
             # Map OpenAI-style messages to a single prompt for simplicity
             # Concatenate roles for context
             prompt = "\n".join(
                 f"{m.get('role','user')}: {m.get('content','')}" for m in messages
             )
-            response = self._genai_model.generate_content(prompt)
+            generation_config = (
+                {"response_mime_type": "application/json"} if json_mode else None
+            )
+            response = self._genai_model.generate_content(
+                prompt, generation_config=generation_config
+            )
             return response.text or ""
         else:
+            kwargs: dict[str, Any] = {}
+            if json_mode and self.model.startswith("openai:"):
+                kwargs["response_format"] = {"type": "json_object"}
             resp = self._client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
+                **kwargs,
             )
             return resp.choices[0].message.content
 
     async def chat_async(
-        self, messages: list[dict[str, Any]], temperature: float = 1.0
+        self,
+        messages: list[dict[str, Any]],
+        temperature: float = 1.0,
+        json_mode: bool = False,
     ) -> str:
         """Async version of chat completion request. Runs sync operations in executor for parallelization."""
         import asyncio
 
         def _sync_chat():
             """Wrapper to run sync chat in executor."""
-            return self.chat(messages, temperature)
+            return self.chat(messages, temperature, json_mode)
 
         # Run sync operation in thread pool to avoid blocking event loop
         # This allows multiple LLM calls to run in parallel
         return await asyncio.to_thread(_sync_chat)
+
+
+@cache
+def get_llm_provider(model: str) -> LLMProvider:
+    """Return the shared provider for model, creating it on first use.
+
+    Reusing one instance keeps the underlying HTTP client and its connection
+    pool warm across requests instead of rebuilding it per call.
+    """
+    return LLMProvider(model=model)
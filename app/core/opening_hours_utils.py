@@ -7,6 +7,11 @@ from datetime import datetime
 from datetime import time as time_obj
 from typing import Any
 
+# "9:00 AM", "12:30pm"
+_TIME_12H_RE = re.compile(r"(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)")
+# "09:00", "17:30"
+_TIME_24H_RE = re.compile(r"(\d{1,2}):(\d{2})")
+
 
 def parse_opening_hours(weekday_text: list[str]) -> dict[str, dict[str, str | None]]:
     """
@@ -45,8 +50,7 @@ def parse_opening_hours(weekday_text: list[str]) -> dict[str, dict[str, str | No
 
         # Parse time range (e.g., "9:00 AM – 5:00 PM")
         # Google uses various separators: –, -, to, etc.
-        time_pattern = r"(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)"
-        matches = re.findall(time_pattern, hours_str)
+        matches = _TIME_12H_RE.findall(hours_str)
 
         if len(matches) >= 2:
             # First match = opening time, last match = closing time
@@ -106,8 +110,7 @@ def parse_time_to_minutes(time_str: str) -> int:
     time_str = time_str.strip()
 
     # Handle 12-hour format with AM/PM
-    am_pm_pattern = r"(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)"
-    match = re.match(am_pm_pattern, time_str)
+    match = _TIME_12H_RE.match(time_str)
 
     if match:
         hour = int(match.group(1))
@@ -138,8 +141,7 @@ def parse_time_to_minutes(time_str: str) -> int:
         return hour * 60 + minute
 
     # Handle 24-hour format (HH:MM)
-    hour_min_pattern = r"(\d{1,2}):(\d{2})"
-    match = re.match(hour_min_pattern, time_str)
+    match = _TIME_24H_RE.match(time_str)
 
     if match:
         hour = int(match.group(1))
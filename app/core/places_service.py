@@ -4,17 +4,113 @@ Google Places API integration for fetching venue data and photos.
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from urllib.parse import quote
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 PLACES_API_BASE = "https://maps.googleapis.com/maps/api/place"
 
+# Shared session so Google Maps calls reuse pooled keep-alive connections
+# instead of a new TCP+TLS handshake per request; gateway errors get two quick
+# retries
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET"],
+        ),
+    ),
+)
+
+# Search queries for the interests offered in the app; unknown interests are
+# searched as their lowercased label
+_INTEREST_TO_QUERY: dict[str, str] = {
+    "Museums": "museums",
+    "Art Galleries": "art galleries",
+    "Fine dining": "fine dining restaurants",
+    "Street food": "street food markets",
+    "Coffee & café hopping": "cafes coffee shops",
+    "Local Festivals": "festivals events",
+    "Architecture & Landmarks": "landmarks monuments",
+    "Historical Tours": "historical sites",
+    "Live Music / Concerts": "live music venues",
+    "Bar Crawls": "bars pubs",
+    "Clubs": "nightclubs",
+    "Beach & Water Activities": "beaches water activities",
+    "Hiking": "hiking trails nature",
+    "Mountains & Scenic Views": "scenic viewpoints",
+    "Spas": "spas wellness",
+    "Shopping": "shopping",
+    "Luxury Boutiques": "luxury shopping boutiques",
+    "Vintage & Thrift": "vintage shops thrift stores",
+    "Instagrammable Spots": "photo spots instagram",
+}
+# Broad categories always searched after the user's own interests
+_ALWAYS_QUERIES = ("tourist attractions", "top restaurants", "things to do", "popular places")
+# Travel-relevant Google place types used when the caller passes none
+_DEFAULT_ALLOWED_TYPES = (
+    "tourist_attraction",
+    "museum",
+    "art_gallery",
+    "restaurant",
+    "cafe",
+    "bar",
+    "night_club",
+    "park",
+    "point_of_interest",
+    "shopping_mall",
+    "clothing_store",
+    "spa",
+    "movie_theater",
+    "stadium",
+    "premise",
+)
+# Google place types that NLP-extracted types may add to the filter
+_EXTRACTABLE_PLACE_TYPES = frozenset(
+    {
+        "tourist_attraction",
+        "museum",
+        "art_gallery",
+        "restaurant",
+        "cafe",
+        "bar",
+        "night_club",
+        "park",
+        "beach",
+        "spa",
+        "shopping_mall",
+        "theater",
+        "stadium",
+        "zoo",
+        "aquarium",
+        "amusement_park",
+        "church",
+        "temple",
+        "mosque",
+        "landmark",
+        "point_of_interest",
+        "natural_feature",
+    }
+)
+
+# Workers for fanning out Place Details lookups; kept below the session's
+# pool_maxsize so concurrent requests never wait on a pooled connection
+PLACE_DETAILS_MAX_WORKERS = 8
+
 
 class PlacesService:
     """Service for interacting with Google Places API."""
@@ -23,6 +119,10 @@ class PlacesService:
         if not GOOGLE_MAPS_API_KEY:
             raise ValueError("GOOGLE_MAPS_API_KEY not found in environment variables")
         self.api_key = GOOGLE_MAPS_API_KEY
+        self.session = _session
+        self._executor = ThreadPoolExecutor(
+            max_workers=PLACE_DETAILS_MAX_WORKERS, thread_name_prefix="place-details"
+        )
 
     def geocode_location(self, location: str) -> dict[str, float] | None:
         """
@@ -38,7 +138,7 @@ class PlacesService:
         geocode_params = {"address": location, "key": self.api_key}
 
         try:
-            geocode_response = requests.get(
+            geocode_response = self.session.get(
                 geocode_url, params=geocode_params, timeout=10
             )
             geocode_response.raise_for_status()
@@ -72,7 +172,7 @@ class PlacesService:
         geocode_params = {"address": location, "key": self.api_key}
 
         try:
-            geocode_response = requests.get(
+            geocode_response = self.session.get(
                 geocode_url, params=geocode_params, timeout=10
             )
             geocode_response.raise_for_status()
@@ -154,7 +254,7 @@ class PlacesService:
             geocode_params = {"address": location, "key": self.api_key}
 
             try:
-                geocode_response = requests.get(
+                geocode_response = self.session.get(
                     geocode_url,
                     params=geocode_params,
                     timeout=10,
@@ -255,7 +355,7 @@ class PlacesService:
                         "key": self.api_key,
                     }
 
-                response = requests.get(search_url, params=params, timeout=10)
+                response = self.session.get(search_url, params=params, timeout=10)
                 response.raise_for_status()
                 data = response.json()
 
@@ -317,7 +417,7 @@ class PlacesService:
         }
 
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -371,6 +471,26 @@ class PlacesService:
             print(f"Error getting place details: {e}")
             return None
 
+    def get_place_details_bulk(
+        self, place_ids: list[str], fields: str | None = None
+    ) -> list[dict[str, Any] | None]:
+        """
+        Get details for several places concurrently.
+
+        Args:
+            place_ids: Google Place IDs
+            fields: Optional comma-separated list of fields, as in get_place_details
+
+        Returns:
+            Details (or None on failure) for each place, in input order
+        """
+        return list(
+            self._executor.map(
+                lambda place_id: self.get_place_details(place_id, fields=fields),
+                place_ids,
+            )
+        )
+
     def get_place_photo_url(
         self, photo_reference: str, max_width: int = 1080
     ) -> str | None:
@@ -484,7 +604,7 @@ class PlacesService:
             if country_code:
                 params["components"] = f"country:{country_code}"
 
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self.session.get(url, params=params, timeout=10)
             resp.raise_for_status()
             data = resp.json()
 
@@ -742,39 +862,14 @@ class PlacesService:
         else:
             price_levels = [3, 4]  # Luxury
 
-        # Map user interests to search queries
-        interest_to_query = {
-            "Museums": "museums",
-            "Art Galleries": "art galleries",
-            "Fine dining": "fine dining restaurants",
-            "Street food": "street food markets",
-            "Coffee & café hopping": "cafes coffee shops",
-            "Local Festivals": "festivals events",
-            "Architecture & Landmarks": "landmarks monuments",
-            "Historical Tours": "historical sites",
-            "Live Music / Concerts": "live music venues",
-            "Bar Crawls": "bars pubs",
-            "Clubs": "nightclubs",
-            "Beach & Water Activities": "beaches water activities",
-            "Hiking": "hiking trails nature",
-            "Mountains & Scenic Views": "scenic viewpoints",
-            "Spas": "spas wellness",
-            "Shopping": "shopping",
-            "Luxury Boutiques": "luxury shopping boutiques",
-            "Vintage & Thrift": "vintage shops thrift stores",
-            "Instagrammable Spots": "photo spots instagram",
-        }
-
         all_places = []
         seen_place_ids = set()
 
-        # Build comprehensive query list: user interests + extracted queries + general categories
-        all_queries = []
-
-        # Add user-specific interests
-        for interest in user_interests:
-            query = interest_to_query.get(interest, interest.lower())
-            all_queries.append(query)
+        # Build comprehensive query list: user interests + extracted queries + general categories,
+        # starting with user-specific interests
+        all_queries = [
+            _INTEREST_TO_QUERY.get(interest, interest.lower()) for interest in user_interests
+        ]
 
         # NEW: Add extracted queries from NLP (other_interests/vibe_notes)
         if extracted_queries:
@@ -786,62 +881,21 @@ class PlacesService:
             )
 
         # Always include broader categories upfront (not as fallback)
-        all_queries.extend(
-            ["tourist attractions", "top restaurants", "things to do", "popular places"]
-        )
+        all_queries.extend(_ALWAYS_QUERIES)
 
         # Default allowed types if not provided (travel-relevant)
         if allowed_types is None:
-            allowed_types = [
-                "tourist_attraction",
-                "museum",
-                "art_gallery",
-                "restaurant",
-                "cafe",
-                "bar",
-                "night_club",
-                "park",
-                "point_of_interest",
-                "shopping_mall",
-                "clothing_store",
-                "spa",
-                "movie_theater",
-                "stadium",
-                "premise",
-            ]
+            allowed_types = list(_DEFAULT_ALLOWED_TYPES)
 
         # NEW: Merge extracted place types with allowed_types
         if extracted_place_types:
             # Filter to valid Google Places types
-            valid_types = [
-                "tourist_attraction",
-                "museum",
-                "art_gallery",
-                "restaurant",
-                "cafe",
-                "bar",
-                "night_club",
-                "park",
-                "beach",
-                "spa",
-                "shopping_mall",
-                "theater",
-                "stadium",
-                "zoo",
-                "aquarium",
-                "amusement_park",
-                "church",
-                "temple",
-                "mosque",
-                "landmark",
-                "point_of_interest",
-                "natural_feature",
-            ]
+            allowed_lower = {t.lower() for t in allowed_types}
             for ext_type in extracted_place_types:
-                if ext_type.lower() in valid_types and ext_type.lower() not in [
-                    t.lower() for t in allowed_types
-                ]:
-                    allowed_types.append(ext_type.lower())
+                ext_lower = ext_type.lower()
+                if ext_lower in _EXTRACTABLE_PLACE_TYPES and ext_lower not in allowed_lower:
+                    allowed_types.append(ext_lower)
+                    allowed_lower.add(ext_lower)
             print(
                 f"[PlacesService] Added {len(extracted_place_types)} extracted place types to filter"
             )
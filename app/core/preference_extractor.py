@@ -2,11 +2,102 @@
 Extract structured information from free-text preferences using LLM.
 """
 
-import json
+import hashlib
 import re
 
-from app.core.llm_provider import LLMProvider
+import orjson
+
+from app.core.llm_provider import get_llm_provider, strip_code_fences
 from app.core.settings import get_settings
+from app.core.ttl_cache import TTLCache
+
+# Successful extractions keyed by (prompt context, normalized text). The same
+# free text is re-extracted whenever an itinerary is regenerated or retried.
+_extraction_cache = TTLCache(maxsize=1024, ttl=600)
+
+# Free-text answers that carry no preference signal ("none", "n/a", ...).
+# These skip the LLM call entirely.
+_TRIVIAL_ANSWERS = frozenset(
+    {
+        "none",
+        "no",
+        "nope",
+        "nah",
+        "n/a",
+        "na",
+        "nil",
+        "nothing",
+        "no preference",
+        "no preferences",
+        "not really",
+        "not sure",
+        "idk",
+        "anything",
+        "any",
+        "whatever",
+        "ok",
+        "okay",
+        "thanks",
+        "thank you",
+    }
+)
+# Text without any letters or digits (e.g. "-", "...", "??")
+_NO_WORDS_RE = re.compile(r"^\W*$")
+# Outermost {...} in an LLM response that may carry prose around the JSON
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+# Invariant across calls; built once so every request sends the same prefix
+_SYSTEM_PROMPT = {
+    "role": "system",
+    "content": (
+        "You are a travel preference extraction system. Extract structured information "
+        "from user's free-text travel preferences.\n\n"
+        "Analyze the text and extract:\n"
+        "1. SEARCH QUERIES: Specific things to search for in Google Places (e.g., 'rooftop bars', "
+        "'street art tours', 'farmers markets'). Return 3-8 specific search queries.\n"
+        "2. PLACE TYPES: Google Places API types (e.g., 'museum', 'restaurant', 'park', 'art_gallery'). "
+        "Return matching types from: tourist_attraction, museum, art_gallery, restaurant, cafe, "
+        "bar, night_club, park, beach, spa, shopping_mall, theater, stadium, zoo, aquarium, "
+        "amusement_park, church, temple, mosque, landmark, point_of_interest, natural_feature.\n"
+        "3. KEYWORDS: Important keywords/phrases for scoring (e.g., 'vintage', 'romantic', 'hidden gems'). "
+        "Return 5-15 keywords.\n"
+        "4. PREFERENCE SIGNALS: Additional preferences like atmosphere (romantic, casual, adventurous), "
+        "style (budget, luxury, mid-range), timing (morning, evening, night), group size preferences.\n\n"
+        "Return ONLY valid JSON in this exact format:\n"
+        "{\n"
+        '  "search_queries": ["query1", "query2", ...],\n'
+        '  "place_types": ["type1", "type2", ...],\n'
+        '  "keywords": ["keyword1", "keyword2", ...],\n'
+        '  "preference_signals": {\n'
+        '    "atmosphere": ["romantic", "casual"],\n'
+        '    "style": "mid-range",\n'
+        '    "timing": ["evening", "night"],\n'
+        '    "group_size": "small"\n'
+        "  }\n"
+        "}\n\n"
+        "If no relevant information found, return empty arrays/lists but keep the structure."
+    ),
+}
+
+
+def _empty_extraction() -> dict[str, any]:
+    return {
+        "search_queries": [],
+        "place_types": [],
+        "keywords": [],
+        "preference_signals": {},
+    }
+
+
+def _is_trivial_text(text: str) -> bool:
+    """True if the text is empty, punctuation-only, or a stock non-answer."""
+    normalized = text.strip().lower().rstrip(".!")
+    return (
+        not normalized
+        or _NO_WORDS_RE.match(normalized) is not None
+        or normalized in _TRIVIAL_ANSWERS
+    )
 
 
 async def extract_preferences_from_text(
@@ -19,6 +110,9 @@ async def extract_preferences_from_text(
         text: Free text input (other_interests or vibe_notes)
         context: Optional context (destination, trip_type, etc.)
 
+    Results are cached for a few minutes per (context, text); callers must
+    treat the returned dict as read-only.
+
     Returns:
         {
             "search_queries": List[str],  # Google Places search queries
@@ -27,58 +121,32 @@ async def extract_preferences_from_text(
             "preference_signals": Dict[str, any]  # Additional signals
         }
     """
-    if not text or not text.strip():
-        return {
-            "search_queries": [],
-            "place_types": [],
-            "keywords": [],
-            "preference_signals": {},
-        }
-
-    settings = get_settings()
-    provider = LLMProvider(model=settings.aisuite_model)
+    if not text or _is_trivial_text(text):
+        return _empty_extraction()
 
     # Build context string
-    context_str = ""
+    context_lines = []
     if context:
         if context.get("destination"):
-            context_str += f"Destination: {context['destination']}\n"
+            context_lines.append(f"Destination: {context['destination']}\n")
         if context.get("trip_type"):
-            context_str += f"Trip Type: {context['trip_type']}\n"
+            context_lines.append(f"Trip Type: {context['trip_type']}\n")
         if context.get("selected_interests"):
-            context_str += f"User's selected interests: {', '.join(context['selected_interests'][:5])}\n"
-
-    system_prompt = {
-        "role": "system",
-        "content": (
-            "You are a travel preference extraction system. Extract structured information "
-            "from user's free-text travel preferences.\n\n"
-            "Analyze the text and extract:\n"
-            "1. SEARCH QUERIES: Specific things to search for in Google Places (e.g., 'rooftop bars', "
-            "'street art tours', 'farmers markets'). Return 3-8 specific search queries.\n"
-            "2. PLACE TYPES: Google Places API types (e.g., 'museum', 'restaurant', 'park', 'art_gallery'). "
-            "Return matching types from: tourist_attraction, museum, art_gallery, restaurant, cafe, "
-            "bar, night_club, park, beach, spa, shopping_mall, theater, stadium, zoo, aquarium, "
-            "amusement_park, church, temple, mosque, landmark, point_of_interest, natural_feature.\n"
-            "3. KEYWORDS: Important keywords/phrases for scoring (e.g., 'vintage', 'romantic', 'hidden gems'). "
-            "Return 5-15 keywords.\n"
-            "4. PREFERENCE SIGNALS: Additional preferences like atmosphere (romantic, casual, adventurous), "
-            "style (budget, luxury, mid-range), timing (morning, evening, night), group size preferences.\n\n"
-            "Return ONLY valid JSON in this exact format:\n"
-            "{\n"
-            '  "search_queries": ["query1", "query2", ...],\n'
-            '  "place_types": ["type1", "type2", ...],\n'
-            '  "keywords": ["keyword1", "keyword2", ...],\n'
-            '  "preference_signals": {\n'
-            '    "atmosphere": ["romantic", "casual"],\n'
-            '    "style": "mid-range",\n'
-            '    "timing": ["evening", "night"],\n'
-            '    "group_size": "small"\n'
-            "  }\n"
-            "}\n\n"
-            "If no relevant information found, return empty arrays/lists but keep the structure."
-        ),
-    }
+            context_lines.append(
+                f"User's selected interests: {', '.join(context['selected_interests'][:5])}\n"
+            )
+    context_str = "".join(context_lines)
+
+    # Reuse a previous extraction of the same text in the same context
+    cache_key = hashlib.blake2b(
+        f"{context_str}\0{' '.join(text.lower().split())}".encode(),
+        digest_size=16,
+    ).digest()
+    cached = _extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    provider = get_llm_provider(get_settings().aisuite_model)
 
     user_prompt = {
         "role": "user",
@@ -89,35 +157,33 @@ async def extract_preferences_from_text(
     try:
         # Use async chat method for parallelization
         response = await provider.chat_async(
-            messages=[system_prompt, user_prompt],
+            messages=[_SYSTEM_PROMPT, user_prompt],
             temperature=0.3,  # Lower temperature for more consistent extraction
+            json_mode=True,
         )
 
-        # Parse JSON response
-        response_text = response.strip()
-
-        # Remove markdown code fences if present
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join([l for l in lines if not l.startswith("```")])
+        # Parse JSON response, removing markdown code fences if present
+        response_text = strip_code_fences(response)
 
         # Extract JSON object
-        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+        json_match = _JSON_OBJECT_RE.search(response_text)
         if json_match:
             response_text = json_match.group(0)
 
         # Convert single quotes to double quotes for JSON
         response_text = response_text.replace("'", '"')
 
-        extracted = json.loads(response_text)
+        extracted = orjson.loads(response_text)
 
         # Validate structure
-        return {
+        result = {
             "search_queries": extracted.get("search_queries", [])[:10],  # Limit to 10
             "place_types": extracted.get("place_types", [])[:15],  # Limit to 15
             "keywords": extracted.get("keywords", [])[:20],  # Limit to 20
             "preference_signals": extracted.get("preference_signals", {}),
         }
+        _extraction_cache.set(cache_key, result)
+        return result
 
     except Exception as e:
         print(f"[PreferenceExtractor] Error extracting from text: {e}")
@@ -14,12 +14,16 @@ from app.core.schemas import (
     UserPreferences,
     UserPreferencesCreate,
 )
+from app.core.ttl_cache import TTLCache
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import InsertOne, MongoClient, UpdateOne
 
 # Load environment variables
 load_dotenv()
 
+# How long authenticated-user lookups by clerk_user_id are served from memory
+USER_CACHE_TTL_SECONDS = 60
+
 
 class MongoDBRepo:
     def __init__(self):
@@ -77,6 +81,9 @@ class MongoDBRepo:
         self.events_collection = self.db.events
         self.user_favorites_collection = self.db.user_favorites
 
+        # Per-process cache of User models by clerk_user_id (see get_user_by_clerk_id_cached)
+        self._user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+
         # Test connection and create indexes only if connection works
         try:
             # Test the connection with a shorter timeout
@@ -256,11 +263,83 @@ class MongoDBRepo:
         return None
 
     # Clerk Integration Methods
+    @staticmethod
+    def _sanitize_clerk_fields(clerk_data: ClerkUserSync) -> dict[str, Any]:
+        """Normalize the optional profile fields coming from Clerk."""
+        sanitized_first = (
+            clerk_data.first_name.strip() if clerk_data.first_name else None
+        )
+        sanitized_last = clerk_data.last_name.strip() if clerk_data.last_name else None
+        sanitized_full = (
+            clerk_data.full_name.strip()
+            if clerk_data.full_name and clerk_data.full_name.strip()
+            else " ".join(part for part in [sanitized_first, sanitized_last] if part)
+            or None
+        )
+        sanitized_image = clerk_data.image_url.strip() if clerk_data.image_url else None
+        return {
+            "first_name": sanitized_first,
+            "last_name": sanitized_last,
+            "full_name": sanitized_full,
+            "image_url": sanitized_image,
+        }
+
+    @classmethod
+    def _clerk_user_updates(
+        cls, existing_user: dict, clerk_data: ClerkUserSync
+    ) -> dict[str, Any]:
+        """Fields to fill in on an existing user (never overwrites set values)."""
+        updates: dict[str, Any] = {}
+
+        if clerk_data.email_verified and not existing_user.get("email_verified"):
+            updates["email_verified"] = True
+
+        for field, value in cls._sanitize_clerk_fields(clerk_data).items():
+            if value and not existing_user.get(field):
+                updates[field] = value
+
+        return updates
+
+    @classmethod
+    def _new_clerk_user_doc(cls, clerk_data: ClerkUserSync, now: datetime) -> dict:
+        """Build the document for a user created from Clerk data."""
+        user_id = f"user_{uuid.uuid4().hex[:12]}"
+        sanitized = cls._sanitize_clerk_fields(clerk_data)
+        return {
+            "id": user_id,
+            "clerk_user_id": clerk_data.clerk_user_id,
+            "email": clerk_data.email,
+            "email_verified": clerk_data.email_verified,
+            "username": clerk_data.username
+            or f"user_{user_id[-8:]}",  # Generate username if not provided
+            "first_name": sanitized["first_name"],
+            "last_name": sanitized["last_name"],
+            "full_name": sanitized["full_name"],
+            "image_url": sanitized["image_url"],
+            "is_active": True,
+            "scopes": ["user"],
+            "onboarding_completed": False,  # New users haven't completed onboarding
+            "onboarding_skipped": False,  # New users haven't skipped onboarding
+            "first_itinerary_email_sent": False,  # New users haven't received first email
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    def _clerk_user_to_model(user_doc: dict) -> User:
+        """Convert a stored user document into the API model."""
+        user_doc.pop("_id", None)  # Remove MongoDB ObjectId
+        user_doc.pop("hashed_password", None)
+        if "onboarding_completed" not in user_doc:
+            user_doc["onboarding_completed"] = False
+        if "onboarding_skipped" not in user_doc:
+            user_doc["onboarding_skipped"] = False
+        return User(**user_doc)
+
     async def sync_clerk_user(self, clerk_data: ClerkUserSync) -> User:
         """Sync or create user from Clerk data."""
         import asyncio
 
-        user_id = f"user_{uuid.uuid4().hex[:12]}"
         now = datetime.utcnow()
 
         # Wrap blocking MongoDB operations in executor to avoid blocking event loop
@@ -276,35 +355,9 @@ class MongoDBRepo:
 
         existing_user = await asyncio.to_thread(_find_user)
 
-        sanitized_first = (
-            clerk_data.first_name.strip() if clerk_data.first_name else None
-        )
-        sanitized_last = clerk_data.last_name.strip() if clerk_data.last_name else None
-        sanitized_full = (
-            clerk_data.full_name.strip()
-            if clerk_data.full_name and clerk_data.full_name.strip()
-            else " ".join(part for part in [sanitized_first, sanitized_last] if part)
-            or None
-        )
-        sanitized_image = clerk_data.image_url.strip() if clerk_data.image_url else None
-
         if existing_user:
-            updates: dict[str, Any] = {}
-
-            if clerk_data.email_verified and not existing_user.get("email_verified"):
-                updates["email_verified"] = True
-
-            if sanitized_first and not existing_user.get("first_name"):
-                updates["first_name"] = sanitized_first
-
-            if sanitized_last and not existing_user.get("last_name"):
-                updates["last_name"] = sanitized_last
-
-            if sanitized_full and not existing_user.get("full_name"):
-                updates["full_name"] = sanitized_full
-
-            if sanitized_image and not existing_user.get("image_url"):
-                updates["image_url"] = sanitized_image
+            previous_clerk_user_id = existing_user.get("clerk_user_id")
+            updates = self._clerk_user_updates(existing_user, clerk_data)
 
             if updates:
                 updates["updated_at"] = now
@@ -317,46 +370,105 @@ class MongoDBRepo:
                 await asyncio.to_thread(_update_user)
                 existing_user.update(updates)
 
-            existing_user.pop("_id", None)
-            existing_user.pop("hashed_password", None)
-            if "onboarding_completed" not in existing_user:
-                existing_user["onboarding_completed"] = False
-            if "onboarding_skipped" not in existing_user:
-                existing_user["onboarding_skipped"] = False
-            return User(**existing_user)
+            # Invalidate after the write so a concurrent read can't re-cache the old doc
+            self.invalidate_cached_user(clerk_data.clerk_user_id)
+            self.invalidate_cached_user(previous_clerk_user_id)
+            return self._clerk_user_to_model(existing_user)
 
         else:
             # Create new user from Clerk data
-            user_doc = {
-                "id": user_id,
-                "clerk_user_id": clerk_data.clerk_user_id,
-                "email": clerk_data.email,
-                "email_verified": clerk_data.email_verified,
-                "username": clerk_data.username
-                or f"user_{user_id[-8:]}",  # Generate username if not provided
-                "first_name": sanitized_first,
-                "last_name": sanitized_last,
-                "full_name": sanitized_full,
-                "image_url": sanitized_image,
-                "is_active": True,
-                "scopes": ["user"],
-                "onboarding_completed": False,  # New users haven't completed onboarding
-                "onboarding_skipped": False,  # New users haven't skipped onboarding
-                "first_itinerary_email_sent": False,  # New users haven't received first email
-                "created_at": now,
-                "updated_at": now,
-            }
+            user_doc = self._new_clerk_user_doc(clerk_data, now)
 
             def _insert_user():
                 return self.users_collection.insert_one(user_doc)
 
             result = await asyncio.to_thread(_insert_user)
+            self.invalidate_cached_user(clerk_data.clerk_user_id)
             if result.inserted_id:
                 user_doc.pop("_id", None)  # Remove MongoDB ObjectId
                 return User(**user_doc)
             else:
                 raise Exception("Failed to create user from Clerk data")
 
+    async def sync_clerk_users_bulk(self, clerk_users: list[ClerkUserSync]) -> list[User]:
+        """
+        Sync or create several Clerk users with one lookup and one bulk write.
+
+        Applies the same rules as sync_clerk_user. Entries for the same user within
+        the batch are merged in order. Returns one User per input, in input order.
+        """
+        import asyncio
+
+        if not clerk_users:
+            return []
+
+        now = datetime.utcnow()
+        clerk_ids = list({c.clerk_user_id for c in clerk_users})
+        emails = list({c.email for c in clerk_users})
+
+        def _find_users():
+            return list(
+                self.users_collection.find(
+                    {
+                        "$or": [
+                            {"clerk_user_id": {"$in": clerk_ids}},
+                            {"email": {"$in": emails}},
+                        ]
+                    }
+                )
+            )
+
+        existing_docs = await asyncio.to_thread(_find_users)
+
+        by_clerk_id: dict[str, dict] = {}
+        by_email: dict[str, dict] = {}
+        for doc in existing_docs:
+            if doc.get("clerk_user_id"):
+                by_clerk_id[doc["clerk_user_id"]] = doc
+            if doc.get("email"):
+                by_email[doc["email"]] = doc
+
+        inserts: list[dict] = []
+        pending_updates: dict[Any, dict[str, Any]] = {}
+        resolved: list[dict] = []
+
+        for clerk_data in clerk_users:
+            user_doc = by_clerk_id.get(clerk_data.clerk_user_id) or by_email.get(
+                clerk_data.email
+            )
+            if user_doc is None:
+                user_doc = self._new_clerk_user_doc(clerk_data, now)
+                inserts.append(user_doc)
+            else:
+                updates = self._clerk_user_updates(user_doc, clerk_data)
+                if updates:
+                    updates["updated_at"] = now
+                    user_doc.update(updates)
+                    # Documents queued for insert already carry the merged fields
+                    if "_id" in user_doc:
+                        pending_updates.setdefault(user_doc["_id"], {}).update(updates)
+
+            by_clerk_id[clerk_data.clerk_user_id] = user_doc
+            by_email[clerk_data.email] = user_doc
+            resolved.append(user_doc)
+
+        operations = [InsertOne(doc) for doc in inserts] + [
+            UpdateOne({"_id": _id}, {"$set": updates})
+            for _id, updates in pending_updates.items()
+        ]
+
+        if operations:
+
+            def _write_users():
+                return self.users_collection.bulk_write(operations, ordered=False)
+
+            await asyncio.to_thread(_write_users)
+
+        for doc in resolved:
+            self.invalidate_cached_user(doc.get("clerk_user_id"))
+
+        return [self._clerk_user_to_model(dict(doc)) for doc in resolved]
+
     async def get_user_by_clerk_id(self, clerk_user_id: str) -> User | None:
         """Get user by Clerk user ID."""
         import asyncio
@@ -380,6 +492,26 @@ class MongoDBRepo:
             return User(**user_doc)
         return None
 
+    async def get_user_by_clerk_id_cached(self, clerk_user_id: str) -> User | None:
+        """
+        Get user by Clerk user ID, served from a short-lived in-process cache.
+
+        Meant for the per-request auth lookup. Writes through this repo invalidate
+        the entry; code that updates users_collection directly must call
+        invalidate_cached_user.
+        """
+        user = self._user_cache.get(clerk_user_id)
+        if user is None:
+            user = await self.get_user_by_clerk_id(clerk_user_id)
+            if user:
+                self._user_cache.set(clerk_user_id, user)
+        return user
+
+    def invalidate_cached_user(self, clerk_user_id: str | None) -> None:
+        """Drop a user from the auth lookup cache after it was modified."""
+        if clerk_user_id:
+            self._user_cache.pop(clerk_user_id)
+
     async def update_user_onboarding(
         self,
         clerk_user_id: str,
@@ -403,6 +535,7 @@ class MongoDBRepo:
             )
 
         result = await asyncio.to_thread(_update_user)
+        self.invalidate_cached_user(clerk_user_id)
 
         if result.modified_count > 0:
             return await self.get_user_by_clerk_id(clerk_user_id)
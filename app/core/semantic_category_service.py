@@ -142,7 +142,7 @@ class SemanticCategoryService:
     def find_relevant_categories(
         self,
         user_preference_text: str,
-        valid_city_categories: set[str],
+        valid_city_categories: set[str] | frozenset[str],
         top_n: int = 10,
     ) -> list[tuple[str, float]]:
         """
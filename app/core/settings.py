@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -10,5 +11,6 @@ class Settings(BaseModel):
     aisuite_model: str = os.getenv("AISUITE_MODEL", "openai:gpt-4o-mini")
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
@@ -2,8 +2,12 @@
 Utilities for calculating travel time between activities.
 """
 
+import re
 from typing import Literal
 
+# "2:00 PM", "10:30 am"
+_TIME_12H_RE = re.compile(r"(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)")
+
 
 def estimate_travel_time(
     distance_km: float, mode: Literal["auto", "walking", "transit", "driving"] = "auto"
@@ -115,10 +119,7 @@ def add_minutes_to_time(time_str: str, minutes: int) -> str:
         New time string in same format
     """
     # Parse the time string
-    import re
-
-    pattern = r"(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)"
-    match = re.match(pattern, time_str.strip())
+    match = _TIME_12H_RE.match(time_str.strip())
 
     if not match:
         # Can't parse - return original
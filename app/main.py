@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -14,13 +15,26 @@ from app.api.routers.events import router as events_router
 from app.api.routers.itineraries import router as itineraries_router
 from app.api.routers.places import router as places_router
 from app.api.routers.webhooks import webhook_router
+from app.core.clerk_auth import clerk_auth
 from app.core.csrf_middleware import CSRFProtectionMiddleware
+from app.core.email_service import email_service
 from app.core.repository import repo
 from app.core.settings import get_settings
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Fetch Clerk's JWKS before serving so the first authenticated request
+    # doesn't pay for the round-trip
+    await clerk_auth.warm_up()
+    yield
+    # Release pooled HTTP connections
+    await clerk_auth.aclose()
+    email_service.close()
+
+
 def create_app() -> FastAPI:
-    application = FastAPI(title="Traverse Backend")
+    application = FastAPI(title="Traverse Backend", lifespan=lifespan)
 
     # CORS: restrict to localhost ports for development
     # Frontend: localhost:3456 (Next.js)
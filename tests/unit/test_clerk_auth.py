@@ -35,9 +35,6 @@ def test_environment_variables():
     print("Testing Environment Variables...")
     print(f"CLERK_SECRET_KEY: {'Set' if CLERK_SECRET_KEY else 'Missing'}")
 
-    if CLERK_SECRET_KEY:
-        print(f"   Secret key preview: {CLERK_SECRET_KEY[:20]}...")
-
     print()
 
 
@@ -0,0 +1,55 @@
+"""Tests for the CSRF origin check middleware."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.csrf_middleware import CSRFProtectionMiddleware
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CSRFProtectionMiddleware)
+
+    @app.get("/items")
+    def list_items():
+        return {"ok": True}
+
+    @app.post("/items")
+    def create_item():
+        return {"ok": True}
+
+    @app.post("/webhooks/clerk")
+    def webhook():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_safe_methods_skip_origin_check():
+    response = _client().get("/items", headers={"Origin": "https://evil.example"})
+
+    assert response.status_code == 200
+
+
+def test_allowed_origin_passes():
+    client = _client()
+
+    assert client.post("/items", headers={"Origin": "http://localhost:3456/"}).status_code == 200
+    assert client.post("/items").status_code == 200
+
+
+def test_disallowed_origin_is_rejected():
+    client = _client()
+
+    response = client.post("/items", headers={"Origin": "https://evil.example"})
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Origin not allowed"}
+
+    response = client.post("/items", headers={"Referer": "https://evil.example/page?x=1"})
+    assert response.status_code == 403
+
+
+def test_webhooks_are_exempt():
+    response = _client().post("/webhooks/clerk", headers={"Origin": "https://svix.example"})
+
+    assert response.status_code == 200
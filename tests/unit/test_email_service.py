@@ -0,0 +1,58 @@
+"""Tests for the email service."""
+
+import httpx
+
+from app.core import email_service as email_service_module
+from app.core.email_service import EmailService
+
+
+def test_invite_html_escapes_user_supplied_fields():
+    html = EmailService()._build_invite_email_html(
+        recipient_name="<b>Ann</b>",
+        organizer_name='Bob "<script>alert(1)</script>"',
+        trip_name="Rome & Naples",
+        destination=None,
+        date_range_start=None,
+        date_range_end=None,
+        custom_message=None,
+        invite_link="https://example.com/invite/abc",
+    )
+
+    assert "<script>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "&lt;b&gt;Ann&lt;/b&gt;" in html
+    assert "Rome &amp; Naples" in html
+
+
+def test_batch_invites_skip_invalid_addresses(monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        email_service_module, "_send_with_retry", lambda path, params: sent.extend(params)
+    )
+
+    results = email_service_module.send_trip_invite_emails(
+        [("ann@example.com", "Ann"), ("not-an-email", None), ("bob@example.com", None)],
+        invite_id="abc",
+        organizer_name="Cy",
+        trip_name="Rome",
+    )
+
+    assert results == [True, False, True]
+    assert [params["to"] for params in sent] == [["ann@example.com"], ["bob@example.com"]]
+
+
+def test_invalid_resend_rps_falls_back_to_default(monkeypatch):
+    for raw in ("0", "-1", "fast"):
+        monkeypatch.setenv("RESEND_RPS", raw)
+        assert email_service_module._read_resend_rps() == email_service_module._DEFAULT_RESEND_RPS
+
+
+def test_exhausted_rate_limit_window_pauses_next_send(monkeypatch):
+    bucket = email_service_module._TokenBucket(1000)
+    monkeypatch.setattr(email_service_module, "_rate_limiter", bucket)
+
+    email_service_module._respect_rate_limit_headers(
+        httpx.Headers({"ratelimit-remaining": "0", "ratelimit-reset": "1"})
+    )
+
+    assert bucket._tokens < 0
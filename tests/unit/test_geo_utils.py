@@ -0,0 +1,13 @@
+"""Tests for geographic helpers."""
+
+from app.core.geo_utils import optimize_daily_route
+
+
+def test_route_orders_stops_across_the_antimeridian():
+    venues = [
+        {"id": 0, "lat": -17.7, "lng": 179.8},
+        {"id": 1, "lat": -17.7, "lng": -179.9},
+        {"id": 2, "lat": -17.7, "lng": 179.9},
+    ]
+
+    assert [v["id"] for v in optimize_daily_route(venues)] == [0, 2, 1]
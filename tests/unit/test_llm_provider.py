@@ -0,0 +1,13 @@
+"""Tests for LLM response helpers."""
+
+from app.core.llm_provider import strip_code_fences
+
+
+def test_strip_code_fences_unwraps_fenced_replies():
+    assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert strip_code_fences("```\n[1, 2]\n```\n") == "[1, 2]"
+    assert strip_code_fences('```JSON\n["Tip"]') == '["Tip"]'
+
+
+def test_strip_code_fences_passes_plain_text_through():
+    assert strip_code_fences('  {"a": 1}\n') == '{"a": 1}'